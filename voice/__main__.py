@@ -13,24 +13,18 @@
     above cmd is identical to
         python -m voice.apis.info
 
-
+    NOTE: heavy imports (colorama, settings, contracts) are deferred into main()
+          so that help calls like 'va -h' or 'va help' return without loading them.
 """
 
-import colorama as color
-
-color.init()
-import importlib
-
-import voice.settings as sts
-import voice.arguments as arguments
-import voice.contracts as contracts
-
 
 def runable(*args, api, **kwargs):
     """
     imports api as a package and executes it
     returns the runable result
     """
+    import importlib
+
     return importlib.import_module(f"voice.apis.{api}")
 
 
@@ -39,12 +33,21 @@ def main(*args, **kwargs):
     to runable from shell these arguments are passed in
     runs api if legidemit and prints outputs
     """
+    import voice.arguments as arguments
+
+    # 'va -h' exits inside argparse, 'va help' returns before the heavy imports
     kwargs = arguments.mk_args().__dict__
+    if kwargs.get("api") == "help":
+        arguments.mk_args(parse=False).print_help()
+        return None
+    import colorama as color
+
+    color.init()
+    import voice.contracts as contracts
 
     # kwargs are vakidated against enforced contract
     kwargs = contracts.checks(*args, **kwargs)
-    if kwargs.get("api") != "help":
-        return runable(*args, **kwargs).main(*args, **kwargs)
+    return runable(*args, **kwargs).main(*args, **kwargs)
 
 
 if __name__ == "__main__":
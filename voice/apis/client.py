@@ -1,13 +1,14 @@
 # voice/apis/client.py
-from voice.vosk_client import VoskClient
 
 def main(*args, **kwargs):
     """
     Entry point for the 'client' API.
     Initializes and runs the VoskClient.
     """
+    # imported here, so loading the apis package does not pull in pynput/requests
+    from voice.vosk_client import VoskClient
     try:
         client = VoskClient(*args, **kwargs)
         client.run()
     except (ValueError, KeyError) as e:
-        print(f"Error initializing client: {e}")
\ No newline at end of file
+        print(f"Error initializing client: {e}")
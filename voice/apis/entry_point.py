@@ -2,9 +2,9 @@
 # this is an example api for voice
 
 from voice import settings as sts
-from voice.voice import DefaultClass
 
 def entry_point_function(*args, **kwargs):
+    from voice.voice import DefaultClass
     inst = DefaultClass(*args, **kwargs)
     return inst
 
@@ -12,4 +12,4 @@ def main(*args, **kwargs):
     """
     All entry points must contain a main function like main(*args, **kwargs)
     """
-    return entry_point_function(*args, pg_name=sts.package_name, **kwargs)
\ No newline at end of file
+    return entry_point_function(*args, pg_name=sts.package_name, **kwargs)
@@ -1,11 +1,17 @@
 # info.py
-import subprocess
 import fnmatch, os, sys
-import pyperclip, requests
-from tabulate import tabulate as tb
 from colorama import Fore, Style
 
+# colors are bound once and dropped when output does not go to a terminal
+if sys.stdout.isatty():
+    _Y, _G, _RED, _R, _RA, _D = (
+        Fore.YELLOW, Fore.GREEN, Fore.RED, Fore.RESET, Style.RESET_ALL, Style.DIM
+    )
+else:
+    _Y = _G = _RED = _R = _RA = _D = ""
+
 import voice.settings as sts
+import voice.arguments as arguments
 from voice.helpers.tree import Tree
 from voice.helpers.import_info import main as import_info
 from voice.helpers.package_info import pipenv_is_active
@@ -14,52 +20,55 @@ from voice.helpers.package_info import pipenv_is_active
 all_infos = {"python", "package"}
 
 
-def collect_infos(msg: str, init=False, info_list: list = []) -> list:
-    if init: info_list.clear()
-    if msg: info_list.append(str(msg))
-    return info_list
+class _Collector(list):
+    """
+    Collects info messages for a single info.main call, empty messages are skipped.
+    """
+    def add(self, msg: str) -> None:
+        if msg: self.append(str(msg))
 
 
-def get_infos(*args, verbose, infos: set = set(), **kwargs):
-    collect_infos('', True)
+def get_infos(*args, buf: _Collector, verbose, infos: set = set(), **kwargs):
     if infos:
         for info in infos:
             try:
-                getattr(sys.modules[__name__], f"{info}_info")(*args, verbose=verbose, **kwargs)
+                getattr(sys.modules[__name__], f"{info}_info")(
+                    *args, buf=buf, verbose=verbose, **kwargs
+                )
             except Exception as e:
                 print(
-                    f"{Fore.RED}ERROR:{Fore.RESET} in {info}_info {e = }. Skipping..."
+                    f"{_RED}ERROR:{_R} in {info}_info {e = }. Skipping..."
                 )
-    collect_infos(
-        f"{Fore.YELLOW}\nfor more infos: {Style.RESET_ALL}va info "
-        f"{Fore.YELLOW}-i{Style.RESET_ALL} {all_infos} "
-        f"{Fore.YELLOW}-v{Style.RESET_ALL} 1-3"
+    buf.add(
+        f"{_Y}\nfor more infos: {_RA}va info "
+        f"{_Y}-i{_RA} {all_infos} "
+        f"{_Y}-v{_RA} 1-3"
     )
-    user_info(*args, **kwargs)
-    server_info(*args, **kwargs)
+    user_info(*args, buf=buf, **kwargs)
+    server_info(*args, buf=buf, **kwargs)
 
-def user_info(*args, **kwargs):
+def user_info(*args, buf: _Collector, **kwargs):
     msg = f"""\n{f" VOICE USER info ":#^80}"""
-    collect_infos(f"{Fore.GREEN}{msg}{Style.RESET_ALL}")
+    buf.add(f"{_G}{msg}{_RA}")
 
-def server_info(*args, **kwargs):
-    msg = f"{Fore.YELLOW}Modify User settings{Fore.RESET}: {sts.user_settings_path}!\n"
-    collect_infos(msg)
-    msg = f"{Fore.YELLOW}serve:{Fore.RESET} va server {Style.DIM}# port is {sts.port}{Style.RESET_ALL}\n"
-    collect_infos(msg)
+def server_info(*args, buf: _Collector, **kwargs):
+    msg = f"{_Y}Modify User settings{_R}: {sts.user_settings_path}!\n"
+    buf.add(msg)
+    msg = f"{_Y}serve:{_R} va server {_D}# port is {sts.port}{_RA}\n"
+    buf.add(msg)
 
-def python_info(*args, **kwargs):
-    collect_infos(f"""\n{Fore.YELLOW}{f" PYTHON info ":#^80}{Style.RESET_ALL}""")
-    collect_infos(f"{sys.executable = }\n{sys.version}\n{sys.version_info}")
+def python_info(*args, buf: _Collector, **kwargs):
+    buf.add(f"""\n{_Y}{f" PYTHON info ":#^80}{_RA}""")
+    buf.add(f"{sys.executable = }\n{sys.version}\n{sys.version_info}")
     with open(os.path.join(sts.project_dir, "Pipfile"), "r") as f:
-        collect_infos(f.read())
+        buf.add(f.read())
 
-def package_info(*args, verbose: int = 0, **kwargs):
-    collect_infos(f"""\n{Fore.YELLOW}{f" PACKAGE info ":#^80}{Style.RESET_ALL}""")
-    collect_infos(f"\n{sts.project_name = }\n{sts.package_dir = }\n{sts.test_dir = }")
-    collect_infos(f"\n\n{sts.project_dir = }")
-    collect_infos(f"{sts.package_name = }\n")
-    collect_infos(
+def package_info(*args, buf: _Collector, verbose: int = 0, **kwargs):
+    buf.add(f"""\n{_Y}{f" PACKAGE info ":#^80}{_RA}""")
+    buf.add(f"\n{sts.project_name = }\n{sts.package_dir = }\n{sts.test_dir = }")
+    buf.add(f"\n\n{sts.project_dir = }")
+    buf.add(f"{sts.package_name = }\n")
+    buf.add(
         (
             f"$PWD: {os.getcwd()}\n"
             f"$EXE: {sys.executable} -> {pipenv_is_active(sys.executable) = }\n"
@@ -70,34 +79,28 @@ def package_info(*args, verbose: int = 0, **kwargs):
                                                                 ignores=sts.ignore_dirs,
                                                                 verbose=verbose)
     )
-    collect_infos(f"{tree.get('tree')}\n")
+    buf.add(f"{tree.get('tree')}\n")
     if verbose:
-        collect_infos(f"{tree.get('contents')}\n")
-    try:
-        collect_infos(
-            subprocess.run(
-                f"va -h".split(),
-                text=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            ).stdout
-        )
-    except Exception as e:
-        print(f"{Fore.RED}Error:{Fore.RESET} {e}")
-    collect_infos(
+        buf.add(f"{tree.get('contents')}\n")
+    # the help text is rendered in-process instead of re-running 'va -h'
+    buf.add(arguments.mk_args(parse=False).format_help())
+    buf.add(
         f"Project import structure:\n" f"{import_info(main_file_name='voice.py', verbose=0, )}"
     )
     with open(os.path.join(sts.project_dir, "Readme.md"), "r") as f:
-        collect_infos(f"\n<readme>\n{f.read()}\n</readme>\n")
+        buf.add(f"\n<readme>\n{f.read()}\n</readme>\n")
         # package help
 
 
 def main(*args, clip=None, **kwargs) -> str:
-    get_infos(*args, **kwargs)
-    out = "\n".join(collect_infos(f"info.main({kwargs})"))
+    buf = _Collector()
+    get_infos(*args, buf=buf, **kwargs)
+    buf.add(f"info.main({kwargs})")
+    out = "\n".join(buf)
     if clip:
+        import pyperclip
         pyperclip.copy(out)
-        print(f"{Fore.GREEN}Copied to clipboard!{Style.RESET_ALL}")
+        print(f"{_G}Copied to clipboard!{_RA}")
     return out
 
 if __name__ == "__main__":
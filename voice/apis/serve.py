@@ -1,11 +1,12 @@
 # voice/apis/serve.py
-from voice.vosk_server import VoskServer
 
 def main(*args, **kwargs):
     """
     Entry point for the 'serve' API.
     Initializes and runs the VoskServer.
     """
+    # imported here, because vosk_server loads flask, vosk and the audio stack
+    from voice.vosk_server import VoskServer
     print("Initializing Vosk server...")
     server = VoskServer()
-    server.run()
\ No newline at end of file
+    server.run()
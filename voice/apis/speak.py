@@ -1,10 +1,9 @@
 # entry_point.py
 # this is an example api for voice
 
-from voice import settings as sts
-import voice.speaker as speaker
 
 def entry_point_function(*args, **kwargs):
+    import voice.speaker as speaker
     inst = speaker.main(*args, **kwargs)
     return inst
 
@@ -12,4 +11,4 @@ def main(*args, **kwargs):
     """
     All entry points must contain a main function like main(*args, **kwargs)
     """
-    return entry_point_function(*args, **kwargs)
\ No newline at end of file
+    return entry_point_function(*args, **kwargs)
@@ -6,11 +6,114 @@
     import voice.arguments
     kwargs.updeate(arguments.mk_args().__dict__)
 """
-import argparse
+import argparse, sys
 from typing import Dict
 
+# optional arguments by dest, all of them are available when no known api is given
+optionals = {
+    "port": (
+        ("--port",),
+        dict(
+            required=False,
+            nargs=None,
+            const=None,
+            type=str,
+            default=None,
+            help=f"Port to run server.pyw on i.e. 9005",
+        ),
+    ),
+    "va_server_ix": (
+        ("-s", "--va_server_ix"),
+        dict(
+            required=False,
+            nargs=None,
+            const=None,
+            type=int,
+            default=None,
+            help=f"Voice Assistant server index, e.g. http://while-ai- 1 :5005",
+        ),
+    ),
+    "text": (
+        ("-t", "--text"),
+        dict(
+            required=False,
+            nargs=None,
+            const=None,
+            type=str,
+            default=None,
+            help=f"Direct input text for TTS.",
+        ),
+    ),
+    "file": (
+        ("-f", "--file"),
+        dict(
+            required=False,
+            nargs=None,
+            const=None,
+            type=str,
+            default=None,
+            help=f"Path to text file for TTS.",
+        ),
+    ),
+    "infos": (
+        ("-i", "--infos"),
+        dict(
+            required=False,
+            nargs="+",
+            const=None,
+            type=str,
+            default=None,
+            help="list of infos to be retreived, default: all",
+        ),
+    ),
+    "verbose": (
+        ("-v", "--verbose"),
+        dict(
+            required=False,
+            nargs="?",
+            const=1,
+            type=int,
+            default=0,
+            help="0:silent, 1:user, 2:debug",
+        ),
+    ),
+    "yes": (
+        ("-y", "--yes"),
+        dict(
+            required=False,
+            nargs="?",
+            const=1,
+            type=bool,
+            default=None,
+            help="run without confirm, not used",
+        ),
+    ),
+}
+
+# optionals each api consumes, verbose is added for every api
+api_optionals = {
+    "info": {"infos", "yes"},
+    "serve": {"port"},
+    "speak": {"text", "file"},
+    "client": {"va_server_ix", "port"},
+    "entry_point": set(),
+    "help": set(),
+}
+
+
+def sniff_api(argv: list) -> str:
+    """
+    returns the first positional cli argument, which by convention is the api name
+    """
+    return next((arg for arg in argv if not arg.startswith("-")), None)
+
 
-def mk_args():
+def mk_args(*args, parse: bool = True, **kwargs):
+    """
+    parses the cli arguments, or with parse=False returns the ArgumentParser holding
+    all arguments, i.e. to render the help text in-process
+    """
+    api = sniff_api(sys.argv[1:]) if parse else None
     parser = argparse.ArgumentParser(description="run: python -m voice info")
     parser.add_argument(
                             "api", 
@@ -20,85 +123,12 @@ def mk_args():
                                     f"see voice.apis"
                                 )
                         )
-    
-
-    parser.add_argument(
-        "--port",
-        required=False,
-        nargs=None,
-        const=None,
-        type=str,
-        default=None,
-        help=f"Port to run server.pyw on i.e. 9005"
-    )    
-
-    parser.add_argument(
-        "-s",
-        "--va_server_ix",
-        required=False,
-        nargs=None,
-        const=None,
-        type=int,
-        default=None,
-        help=f"Voice Assistant server index, e.g. http://while-ai- 1 :5005"
-    )
-
-    parser.add_argument(
-        "-t",
-        "--text",
-        required=False,
-        nargs=None,
-        const=None,
-        type=str,
-        default=None,
-        help=f"Direct input text for TTS."
-    )
-
-    parser.add_argument(
-        "-f",
-        "--file",
-        required=False,
-        nargs=None,
-        const=None,
-        type=str,
-        default=None,
-        help=f"Path to text file for TTS."
-    )
-
-    parser.add_argument(
-        "-i",
-        "--infos",
-        required=False,
-        nargs="+",
-        const=None,
-        type=str,
-        default=None,
-        help="list of infos to be retreived, default: all",
-    )
-
-    parser.add_argument(
-        "-v",
-        "--verbose",
-        required=False,
-        nargs="?",
-        const=1,
-        type=int,
-        default=0,
-        help="0:silent, 1:user, 2:debug",
-    )
-
-    parser.add_argument(
-        "-y",
-        "--yes",
-        required=False,
-        nargs="?",
-        const=1,
-        type=bool,
-        default=None,
-        help="run without confirm, not used",
-    )
-
-    return parser.parse_args()
+    # unknown apis (or a missing api) get every optional argument
+    dests = api_optionals[api] | {"verbose"} if api in api_optionals else optionals.keys()
+    for dest, (flags, params) in optionals.items():
+        if dest in dests:
+            parser.add_argument(*flags, **params)
+    return parser.parse_args() if parse else parser
 
 
 
@@ -112,20 +142,15 @@ def get_required_flags(parser: argparse.ArgumentParser) -> Dict[str, bool]:
     Returns:
         Dict[str, bool]: A dictionary with argument names as keys and their 'required' status as values.
     """
-    required_flags = {}
-    for action in parser._actions:
-        if isinstance(action, argparse._StoreAction):
-            # For positional arguments, the 'required' attribute is not explicitly set,
-            # but they are required by default.
-            is_required = getattr(action, 'required', True) if action.option_strings == [] else action.required
-            # Option strings is a list of option strings (e.g., '-f', '--foo').
-            for option_string in action.option_strings:
-                required_flags[option_string] = is_required
-            if not action.option_strings: # For positional arguments
-                required_flags[action.dest] = is_required
-    return required_flags
+    # positional arguments are keyed by dest, their 'required' is set by argparse
+    return {
+        option_string: action.required
+        for action in parser._actions
+        if isinstance(action, argparse._StoreAction)
+        for option_string in (action.option_strings or [action.dest])
+    }
 
 if __name__ == "__main__":
-    parser = mk_args()
+    parser = mk_args(parse=False)
     required_flags = get_required_flags(parser)
     print(required_flags)
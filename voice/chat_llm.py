@@ -1,11 +1,27 @@
-import ast, json, os, re, subprocess, sys, threading, time, urllib.error, urllib.request
-from tabulate import tabulate as tb
-from voice_class import App, Conversation
+import ast, http.client, importlib.util, json, os, re, select, subprocess, sys, threading
 from colorama import Fore, Back, Style
 
+try:
+    import orjson
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:
+    _dumps = lambda obj: json.dumps(obj, separators=(',', ':'), ensure_ascii=False
+                                    ).encode('utf-8')
+    _loads = json.loads
+
+# answer markers, most specific first, so equal positions resolve to the longer marker
+_ANSWER_MARKERS = ('\n# Answer:', '\n# Answer', '\nAnswer:', '\nAnswer')
+_ANSWER_RE = re.compile('|'.join(map(re.escape, _ANSWER_MARKERS)))
+# matches the devices dict printed by devices.py
+_DEVICES_RE = re.compile(r"(?<=\n)\{.*\}", re.DOTALL)
+DEVICES_SCRIPT = r"C:/Users/lars/python_venvs/packages/altered_bytes/altered/devices.py"
+
 
 class Assistant:
-    
+    # altered_bytes devices module, imported once on first device query,
+    # False if the import failed
+    _devices_mod = None
+
     def __init__(self, altered_cwd: str = "") -> None:
         """
         Initialize the Assistant with the working directory for the external
@@ -13,6 +29,10 @@ class Assistant:
         """
         self.altered_cwd = altered_cwd or os.environ.get("altered_bytes", ".")
         self.response_string = "Voice Assistant: "
+        # FastAPI server address and the keep-alive connection are created on
+        # first request, so a missing env var is reported by _send_request
+        self._address = None
+        self._conn = None
 
     def get_response(self, user_prompt: str) -> tuple:
         """
@@ -52,20 +72,59 @@ class Assistant:
                                 )
         return switch, user_prompt
 
+    def _get_conn(self) -> http.client.HTTPConnection:
+        """
+        Return the keep-alive connection to the FastAPI server, connecting if needed.
+        An idle connection that the server has closed is replaced before use.
+        """
+        if self._conn is not None and self._conn.sock is not None:
+            # an idle socket is only readable once the server closed it
+            if select.select([self._conn.sock], [], [], 0)[0]:
+                self._close_conn()
+        if self._conn is None:
+            if self._address is None:
+                self._address = tuple(json.loads(os.environ['ALTERED_BYTES_FAST_API']).values())
+            ip, port = self._address
+            self._conn = http.client.HTTPConnection(ip, port, timeout=60)
+        return self._conn
+
+    def _close_conn(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _post(self, path: str, data: bytes, headers: dict) -> str:
+        """
+        POST data via the keep-alive connection and return the decoded response body.
+        The request is re-sent once only if sending it failed. Once it is sent the
+        server may already be processing it, so later errors are raised.
+        """
+        for retry in (True, False):
+            conn = self._get_conn()
+            try:
+                conn.request('POST', path, body=data, headers=headers)
+            except (http.client.HTTPException, OSError):
+                self._close_conn()
+                if retry:
+                    continue
+                raise
+            try:
+                return conn.getresponse().read().decode('utf-8')
+            except (http.client.HTTPException, OSError):
+                self._close_conn()
+                raise
+
     def _send_request(self, payload: dict) -> str:
         """
         Send request to the FastAPI server and return raw response string.
         """
-        IP, PORT = json.loads(os.environ['ALTERED_BYTES_FAST_API']).values()
-        url = f"http://{IP}:{PORT}/call/"
-        # url = f"http://127.0.0.1:{os.environ.get('ALTERED_BYTES_PORT', 8777)}/call/"
         try:
-            data = json.dumps(payload).encode('utf-8')
+            data = _dumps(payload)
             headers = {'Content-Type': 'application/json'}
-            req = urllib.request.Request(url, data=data, headers=headers, method='POST')
-            with urllib.request.urlopen(req, timeout=60) as response:
-                r = response.read().decode('utf-8')
-                return json.loads(r.split(self.response_string)[-1].strip())
+            r = self._post('/call/', data, headers)
+            # only the text after the last response_string is the json payload
+            i = r.rfind(self.response_string)
+            return _loads(r[i + len(self.response_string):].strip() if i >= 0 else r.strip())
         except Exception as e:
             print(f"{Fore.RED}ERROR: chat_llm.Assistant._send_request:{Fore.RESET} {e}")
             return {"response": f"ERROR {e = }"}
@@ -75,17 +134,16 @@ class Assistant:
         """
         Process the result from the altered API response.
         """
-        response, answer = r.get("response"), ""
-        for marker in {'\n# Answer:', '\n# Answer', '\nAnswer:', '\nAnswer'}:
-            if marker in response:
-                answer = response.split(marker)[1].strip() + '\nAnything else?'
-                break
+        response, answer = r.get("response") or "", ""
+        m = _ANSWER_RE.search(response)
+        if m:
+            answer = response[m.end():].strip() + '\nAnything else?'
         return response, answer
 
     @staticmethod
     def get_devices() -> dict:
         """
-        Gets the devices from the altered_bytes package by running a script
+        Gets the devices from the altered_bytes package devices module
         {
             '192.168.0.10': {'state': 'OFF', 'title': 'gold_lamp_living'}, 
             '192.168.0.120': {'state': 'ON', 'title': 'print_3d_office'}, 
@@ -104,31 +162,68 @@ class Assistant:
             | 192.168.0.55  |  OFF  | panel_led_lamp_office |
             +---------------+-------+-----------------------+
         """
-        script_path = r"C:/Users/lars/python_venvs/packages/altered_bytes/altered/devices.py"
         try:
-            # Single line for subprocess call and processing
-            raw_output = subprocess.run([sys.executable, script_path],
-                                            capture_output=True,
-                                            text=True,
-                                            check=True
-                        ).stdout.strip()
-            # Parse the output to get the devices json string
-            json_str = re.search(r"(?<=\n)\{.*\}", raw_output, re.DOTALL)
-            try:
-                devices = ast.literal_eval(json_str.group(0))
-                # Convert to a tabulate table
-                if not devices:
-                    return f"ERROR creating devices table: {raw_output = }"
-                return tb([{'IP': ip, **vs} for ip, vs in devices.items()], 
-                            headers="keys", tablefmt="pretty")
-            except (SyntaxError, ValueError) as e:
-                print(f"{Fore.RED}ERROR: chat_llm.Assistant.get_devices:{Fore.RESET} "
-                        f"Failed to parse devices output: {e}")
-                return f"ERROR parsing status info: {raw_output = }"
+            devices = Assistant._read_devices()
+        except (SyntaxError, ValueError) as e:
+            print(f"{Fore.RED}ERROR: chat_llm.Assistant.get_devices:{Fore.RESET} "
+                    f"Failed to parse devices output: {e}")
+            return f"ERROR parsing status info: {e = }"
         except Exception as e:
             print(f"{Fore.RED}ERROR: chat_llm.Assistant.get_devices:{Fore.RESET} "
                     f"Failed to get devices: \n{e = }")
-            return f"ERROR getting devices: {raw_output = }"
+            return f"ERROR getting devices: {e = }"
+        # Convert to a tabulate table, tabulate is only needed for device prompts
+        from tabulate import tabulate as tb
+        if not devices:
+            return f"ERROR creating devices table: {devices = }"
+        return tb([{'IP': ip, **vs} for ip, vs in devices.items()], 
+                    headers="keys", tablefmt="pretty")
+
+    @classmethod
+    def _read_devices(cls) -> dict:
+        """
+        Returns the devices dict. devices.py is imported once and its get_devices()
+        is called in-process. If the import fails or the module does not expose
+        get_devices(), the script is run in a subprocess and its printed dict is
+        parsed instead, as before.
+        """
+        get_devices = cls._load_devices_api()
+        if get_devices is not None:
+            try:
+                return get_devices()
+            except Exception as e:
+                print(f"{Fore.YELLOW}WARNING: chat_llm.Assistant._read_devices:{Fore.RESET} "
+                        f"in-process get_devices failed, running devices.py: {e = }")
+        raw_output = subprocess.run([sys.executable, DEVICES_SCRIPT],
+                                        capture_output=True,
+                                        encoding="utf-8",
+                                        check=True
+                    ).stdout.strip()
+        # Parse the output to get the devices json string
+        json_str = _DEVICES_RE.search(raw_output)
+        if json_str is None:
+            raise ValueError(f"no devices dict found in {raw_output = }")
+        return ast.literal_eval(json_str.group(0))
+
+    @classmethod
+    def _load_devices_api(cls):
+        """
+        Returns devices.get_devices or None. The import is attempted only once,
+        a module without get_devices() or a failing import is not retried.
+        """
+        if cls._devices_mod is None:
+            try:
+                spec = importlib.util.spec_from_file_location("altered_devices",
+                                                                DEVICES_SCRIPT)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                cls._devices_mod = module
+            except Exception as e:
+                print(f"{Fore.YELLOW}WARNING: chat_llm.Assistant._load_devices_api:"
+                        f"{Fore.RESET} could not import devices.py: {e = }")
+                cls._devices_mod = False
+        get_devices = getattr(cls._devices_mod, "get_devices", None)
+        return get_devices if callable(get_devices) else None
 
 
 class Chat:
@@ -138,6 +233,8 @@ class Chat:
         Initialize the Chat with an App instance, an Assistant instance, and
         store the initial user message count.
         """
+        # imported here, so Assistant can be used without loading the audio/gui stack
+        from voice_class import App
         self.app = App()
         self.assistant = Assistant()
         self.prev_user_count = self.app.conv_manager.msg_count_user
@@ -147,10 +244,16 @@ class Chat:
         Monitor the conversation continuously. Each time a new user message
         is detected (i.e. the user message count increases), call the 
         assistant_response method and add its result as an assistant message 
-        to the conversation.
+        to the conversation. The monitor sleeps until the conversation signals
+        a new user message. The wait is timed, an untimed wait cannot be
+        interrupted by Ctrl+C on Windows.
         """
+        new_user_msg = self.app.conv_manager.new_user_msg
         try:
             while True:
+                if not new_user_msg.wait(timeout=1):
+                    continue
+                new_user_msg.clear()
                 curr_user_count = self.app.conv_manager.msg_count_user
                 if curr_user_count != self.prev_user_count:
                     last_user_msg = self.app.conversation.get_last_message(role="user")
@@ -163,7 +266,6 @@ class Chat:
                                                     content=answer if answer else response
                     )
                     self.prev_user_count = curr_user_count
-                time.sleep(1)
         except KeyboardInterrupt:
             print("Shutting down conversation monitoring...")
 
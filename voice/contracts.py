@@ -25,13 +25,12 @@ def check_env_vars(*args, **kwargs):
 
 def clean_kwargs(*args, **kwargs):
     # kwargs might come from a LLM api and might be poluted with whitespaces ect.
-    cleaned_kwargs = {}
-    for k, vs in kwargs.items():
-        if isinstance(vs, str):
-            cleaned_kwargs[k.strip()] = vs.strip().strip("'")
-        else:
-            cleaned_kwargs[k.strip()] = vs
-    return cleaned_kwargs
+    clean = lambda v: v.strip().strip("'") if isinstance(v, str) else v
+    # cli kwargs are usually clean, then no new dict is needed
+    if all(k == k.strip() and (not isinstance(v, str) or v == clean(v))
+            for k, v in kwargs.items()):
+        return kwargs
+    return {k.strip(): clean(vs) for k, vs in kwargs.items()}
 
 def check_missing_kwargs(*args, api,  **kwargs):
     """
@@ -48,16 +47,14 @@ def check_missing_kwargs(*args, api,  **kwargs):
         exit()
 
 def set_server_name(*args, va_server_ix:int=None, **kwargs):
-    if va_server_ix is not None:
-        # we check that va_server_ix is a integer between 0 and 10
-        if type(va_server_ix) is not int:
-            print(f"{Fore.RED}va_server_ix must be an integer between 0 and 10{Style.RESET_ALL}")
-            exit()
-        elif not (0 <= va_server_ix <= 10):
-            print(f"{Fore.RED}va_server_ix must be an integer between 0 and 10{Style.RESET_ALL}")
-            exit()
-        else:
-            # we construct the va_server variable using va_server_prefix
-            va_server = f"{sts.servers.get(f'{sts.va_server_prefix}{va_server_ix}', None)}"
-            print(f"{Fore.GREEN}Using va_server: {va_server}{Style.RESET_ALL}")
-    return {'va_server': f"http://{va_server}"} if va_server_ix is not None else {}
+    # most calls do not select a server, so this returns before any checks
+    if va_server_ix is None:
+        return {}
+    # we check that va_server_ix is a integer between 0 and 10
+    if not isinstance(va_server_ix, int) or not (0 <= va_server_ix <= 10):
+        print(f"{Fore.RED}va_server_ix must be an integer between 0 and 10{Style.RESET_ALL}")
+        exit()
+    # we construct the va_server variable using va_server_prefix
+    va_server = sts.servers.get(f'{sts.va_server_prefix}{va_server_ix}', None)
+    print(f"{Fore.GREEN}Using va_server: {va_server}{Style.RESET_ALL}")
+    return {'va_server': f"http://{va_server}"}
@@ -1,27 +1,109 @@
 # collections.py
-import json, os, re, shutil, subprocess, sys, textwrap, time, yaml
+import functools, json, os, re, shutil, sys, textwrap, time, yaml
 from contextlib import contextmanager
 from pathlib import Path
 from tabulate import tabulate as tb
 from datetime import datetime as dt
+from colorama import Fore, Style
 
 import voice.settings as sts
 
+# LibYAML's C loader is used when available, it parses much faster than SafeLoader
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# regexes are compiled once at import, see restore_existing_linebreaks, strip_ansi_codes
+# a run of <lb> markers, optionally followed by a code block that ends in <lb> markers,
+# or by a numbered/dashed list item, a dash directly followed by text is matched apart
+_RX_RESTORE = re.compile(
+                            r'(?P<pre>\s*)(?:<lb>\s*)+'
+                            r'(?:(?P<block><code_block_\d+>\s*)(?:<lb>\s*)+'
+                            r'|(?P<item>(?=\d+\.\s|-\s))|(?P<dash>(?=-)))?'
+)
+_RX_ANSI = re.compile(r'\x1b\[([0-9]+)(;[0-9]+)*m')
+
+_RX_LITERAL = re.compile(r'[^\\.^$*+?{}\[\]|()]*')
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    """
+    True if pattern contains a | outside of groups, character classes and escapes
+    """
+    depth, in_class, chars = 0, False, iter(enumerate(pattern))
+    for i, c in chars:
+        if c == '\\':
+            next(chars, None)
+        elif in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+            # a ] right after [ or [^ is part of the class
+            rest = pattern[i + 1:]
+            skip = 2 if rest.startswith('^]') else 1 if rest.startswith(']') else 0
+            for _ in range(skip):
+                next(chars, None)
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            return True
+    return False
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    leading plain-text part of a regex, a char followed by a quantifier is dropped,
+    a pattern with a top-level | has no common prefix
+    """
+    if _has_top_level_alternation(pattern):
+        return ''
+    prefix = _RX_LITERAL.match(pattern).group()
+    if pattern[len(prefix):len(prefix) + 1] in ('*', '?', '{'):
+        prefix = prefix[:-1]
+    return prefix
+
+@functools.lru_cache(maxsize=8)
+def _compile_tags(tags: tuple) -> tuple:
+    """
+    compiles the hide_tags regexes per (start, end, ...) tag, with and without leading
+    whitespace, the literal start prefix lets hide_tags skip tags that cannot match
+    cached on the tag values, so changes to sts.tags are picked up
+    """
+    compiled = []
+    for start, end, *_ in tags:
+        compiled.append((
+                            start, end, _literal_prefix(start),
+                            re.compile(fr'({start}.*?{end})', re.DOTALL).sub,
+                            re.compile(fr'(\s*{start}.*?{end})', re.DOTALL).sub,
+        ))
+    return tuple(compiled)
+
 def unalias_path(work_path: str) -> str:
     """
     repplaces path aliasse such as . ~ with path text
     """
     if not any([e in work_path for e in [".", "~", "%"]]):
         return work_path
+    return _unalias_path(work_path, os.getcwd(), os.path.expanduser("~"))
+
+
+@functools.lru_cache(maxsize=1024)
+def _unalias_path(work_path: str, cwd: str, home: str) -> str:
+    """
+    cached unalias_path, cwd and home are part of the key because results depend on them
+    """
     work_path = work_path.replace(r"%USERPROFILE%", "~")
-    work_path = work_path.replace("~", os.path.expanduser("~"))
+    work_path = work_path.replace("~", home)
     if work_path.startswith(".."):
-        work_path = os.path.join(os.path.dirname(os.getcwd()), work_path[3:])
+        work_path = os.path.join(os.path.dirname(cwd), work_path[3:])
     elif work_path.startswith("."):
-        work_path = os.path.join(os.getcwd(), work_path[2:])
+        work_path = os.path.join(cwd, work_path[2:])
     work_path = os.path.normpath(os.path.abspath(work_path))
     return work_path
 
+unalias_path.cache_clear = _unalias_path.cache_clear
+
 
 def _handle_integer_keys(self, intDict) -> dict:
     """
@@ -49,20 +131,35 @@ def prep_path(work_path: str, file_prefix=None) -> str:
 
 
 def get_sec_entry(d, matcher, ret="key", current_key=None) -> str:
-    if isinstance(d, dict):
-        for key, value in d.items():
+    """
+    Depth-first search of nested dicts for the first key equal to matcher, walked
+    iteratively with a stack of item iterators instead of recursion. Returns the
+    parent key of the match (current_key at the top level) or, if ret != "key",
+    its value. A None result inside a nested dict continues the search in its parent.
+    """
+    if not isinstance(d, dict):
+        return None
+    stack = [(current_key, iter(d.items()))]
+    while stack:
+        parent_key, items = stack[-1]
+        for key, value in items:
             if key == matcher:
-                return current_key if ret == "key" else d[key]
-            elif isinstance(value, dict):
-                result = get_sec_entry(value, matcher, ret, current_key=key)
+                result = parent_key if ret == "key" else value
                 if result is not None:
                     return result
+                stack.pop()
+                break
+            elif isinstance(value, dict):
+                stack.append((key, iter(value.items())))
+                break
+        else:
+            stack.pop()
     return None
 
 
 def load_yml(testFilePath, *args, **kwargs):
     with open(testFilePath, "r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_Loader)
 
 
 def load_str(testFilePath, *args, **kwargs):
@@ -84,7 +181,7 @@ def group_text(text, charLen, *args, **kwargs):
         # text = text.replace(' <lb> ', '\n').replace('<lb>', '\n')
         # text = text.replace('<tab>', '\t')
     elif type(text) is list:
-        text = "\n".join(textwrap.wrap("\n".join([t for t in text]), width=charLen))
+        text = "\n".join(textwrap.wrap("\n".join(text), width=charLen))
     else:
         print(type(text), text)
     return '\n' + text
@@ -105,19 +202,42 @@ def restore_existing_linebreaks(text, *args, **kwargs) -> str:
     Returns:
         str: The text with the modified line breaks.
     """
-    # print(re.findall(r'<lb>\s*(\d+\.\s)', text))
-    text = re.sub(r'(<lb>\s*)(\d+\.\s)', r'\n\2', text)
-    text = re.sub(r'(<lb>\s*)(-\s*)', r'\n\2', text)
-    text = re.sub(r'(<lb>\s*)(<code_block_\d+>\s*)(<lb>\s*)', r'\n\2\n', text)
-    text = re.sub(r'\n(\n\d+\.\s|\n-\s|\n<code_block_\d+\s)', r'\1', text)
-    # print(f"restore_existing_linebreaks: \n{text = }")
-    text = re.sub(r'\n<lb>\s*', r'\n', text)
-    text = re.sub(r'\s*<lb>\s*', r' ', text)
-    return text
+    return _RX_RESTORE.sub(_restore_linebreak, text)
+
+def _restore_linebreak(m: re.Match) -> str:
+    """
+    replacement for one _RX_RESTORE match, list items and code blocks start a new line,
+    markers right after a line break are dropped and all other markers become a single
+    space. Whitespace before the markers is kept wherever the markers become a line
+    break, so existing line breaks and paragraphs survive, as with the former
+    sequential re.sub passes.
+    """
+    pre = m.group('pre')
+    if m.group('block') is not None:
+        return f"{pre}\n{m.group('block')}\n"
+    if m.group('item') is not None:
+        # a list item that already starts a line gets no second line break
+        return pre if pre.endswith('\n') else f"{pre}\n"
+    if m.group('dash') is not None:
+        return f"{pre}\n"
+    return pre if pre.endswith('\n') else ' '
+
+def walk(top, topdown=True):
+    """
+    os.walk signature, backed by os.fwalk where available (Unix) so each level
+    is listed relative to an open directory fd instead of re-resolving paths.
+    """
+    if not hasattr(os, "fwalk"):
+        yield from os.walk(top, topdown=topdown)
+        return
+    for root, dirs, files, _ in os.fwalk(top, topdown=topdown):
+        yield root, dirs, files
+
 
 def collect_ignored_dirs(source, ignore_dirs, *args, **kwargs):
     """
-    Uses os.walk and regular expressions to collect directories to be ignored.
+    Uses walk and regular expressions to collect directories to be ignored.
+    Directories below an ignored directory are not walked and not collected.
 
     Args:
         source (str): The root directory to start searching from.
@@ -129,11 +249,16 @@ def collect_ignored_dirs(source, ignore_dirs, *args, **kwargs):
     ignored = set()
     regexs = [re.compile(d) for d in ignore_dirs]
 
-    for root, dirs, _ in os.walk(source, topdown=True):
+    for root, dirs, _ in walk(source, topdown=True):
+        keep = []
         for dir in dirs:
             dir_path = os.path.join(root, dir).replace(os.sep, '/')
             if any(regex.search(dir_path) for regex in regexs):
                 ignored.add(os.path.normpath(dir_path))
+            else:
+                keep.append(dir)
+        # ignored subtrees are not descended into, their root already covers them
+        dirs[:] = keep
     return ignored
 
 def custom_ignore(ignored):
@@ -184,8 +309,10 @@ def pretty_print_messages(messages, *args, verbose:int=0, clear=True, save=True,
     (role, content)
     """
     tbl = to_tbl(messages, *args, verbose=verbose, **kwargs)
-    # use subprocess to clear the terminal
-    if clear: subprocess.run(["cmd.exe", "/c", "cls"])
+    # clear the terminal via ANSI codes, no cls subprocess needed and works on any os
+    if clear:
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
     # print(printable)
     if save: save_table(tbl, *args, **kwargs)
     return tbl
@@ -200,10 +327,9 @@ def to_tbl(data, *args, verbose:int=0, headers=['EXPERT', 'MESSAGE'], tablefmt='
     return tb(tbl, headers=headers, tablefmt=tablefmt)
 
 def color_expert(name, role, *args, **kwargs):
-    try:
-        color = sts.experts.get(name.lower(), {}).color_code
-    except AttributeError:
-        color = Fore.RED
+    # sts.experts is read per call so settings changes apply, unknown names get red
+    expert = getattr(sts, "experts", {}).get(name.lower())
+    color = getattr(expert, "color_code", Fore.RED)
     name = f"{sts.watermark if role == 'agent' else ''} {color}{name}:{Style.RESET_ALL}"
     return name
 
@@ -218,14 +344,12 @@ def colorize_code_blocks(code_blocks:dict, *args, **kwargs):
     return colorized
 
 def _decolorize(line, *args, **kwargs):
-    line = line.replace(Fore.YELLOW, "").replace(Fore.BLUE, "").replace(Fore.GREEN, "")
-    line = line.replace(Fore.RED, "").replace(Fore.CYAN, "").replace(Fore.WHITE, "")
-    line = line.replace(sts.DIM, "").replace(Fore.RESET, "").replace(Style.RESET_ALL, "")
-    return line
+    # all color and style codes are SGR sequences, so one regex pass strips them
+    return _RX_ANSI.sub("", line)
 
 def save_table(tbl, *args, **kwargs):
     table_path = os.path.join(sts.chat_logs_dir, f"{sts.session_time_stamp}_chat.log")
-    tbl = '\n'.join([_decolorize(l) for l in tbl.split('\n')])
+    tbl = _decolorize(tbl)
     with open(table_path, 'w', encoding='utf-8') as f:
         f.write(tbl)
 
@@ -240,18 +364,21 @@ def hide_tags(text, *args, verbose:int=0, **kwargs):
             Options:
                 ['pg_info', ]: removes everything between <pg_info> and </pg_info>
     """
-    for start, end in sts.tags.values():
+    tags = tuple(tuple(tag) for tag in sts.tags.values())
+    for start, end, prefix, sub, sub_stripped in _compile_tags(tags):
+        if prefix not in text:
+            continue
         # the replacement term depends on verbosity. If verbose, add a newline
         # otherwise remove the tag completely.
         if verbose == 0:
-            start, replacement = r"\s*" + start, r''
+            sub, replacement = sub_stripped, r''
         elif verbose <= 1:
             replacement = f"{Fore.CYAN}{start}...{end}{Style.RESET_ALL}"
         else:
             replacement = f'\n{Fore.CYAN}\\1{Style.RESET_ALL}\n'
         # replacement = r'' if verbose < 1 else f"{start}...{end}" if verbose < 2 else r'\n\1\n'
         # flags must be set to re.DOTALL to match newline characters and multiline strings
-        text = re.sub(fr'({start}.*?{end})', replacement, text, flags=re.DOTALL)
+        text = sub(replacement, text)
     return '\n' + text
 
 def prettyfy_instructions(instructs, tag:str='instructs', *args, verbose:int=1, **kwargs):
@@ -281,5 +408,4 @@ def strip_ansi_codes(text: str) -> str:
     Returns:
         str: Text with ANSI codes removed.
     """
-    ansi_escape = re.compile(r'\x1b\[([0-9]+)(;[0-9]+)*m')
-    return ansi_escape.sub('', text)
+    return _RX_ANSI.sub('', text)
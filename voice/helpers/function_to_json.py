@@ -1,7 +1,6 @@
-import ast, inspect, json, os, re, sys, textwrap, types
-from copy import deepcopy
+import ast, inspect, io, json, os, re, sys, textwrap, tokenize, types
 from datetime import datetime as dt
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Any, Callable, Dict, List
 
 from colorama import Fore, Style
@@ -10,6 +9,33 @@ from tabulate import tabulate as tb
 import voice.settings as sts
 from dataclasses import dataclass, asdict
 
+# parse_docstring patterns, the Args section and a single 'name (type): description' line
+_RX_ARGS_SECTION = re.compile(r'Args:\n\s+(.*?)(\n\n|\Z)', re.DOTALL)
+_RX_ARG_LINE = re.compile(r'(\w+) \((.+?)\): (.+)')
+# Python type -> JSON-Schema primitive, read-only and shared by all schema builders
+_PY2JSON = types.MappingProxyType({
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+    type(None): "null",
+})
+
+
+@lru_cache(maxsize=512)
+def _code_source_lines(code: types.CodeType) -> tuple:
+    lines, _ = inspect.getsourcelines(code)
+    return tuple(lines)
+
+
+def get_source_lines(func: Callable) -> tuple:
+    """
+    Source lines of func, read and tokenized only once per code object.
+    """
+    return _code_source_lines(inspect.unwrap(func).__code__)
+
 
 @dataclass
 class BaseSchema:
@@ -39,34 +65,37 @@ class BaseSchema:
 
     @staticmethod
     def get_function_code(func: Callable) -> str:
-        lines, _ = inspect.getsourcelines(func)
-        docStrRegex = "'''|\"\"\""
-        ixs = sorted([ix.start() for ix in re.finditer(docStrRegex, ''.join(lines))])
-        if len(ixs) >= 2:
-            body_lines = [line for ix, line in enumerate(lines) if ix < ixs[0] or ix > ixs[1]]
-        else:
-            body_lines = lines
+        lines = get_source_lines(func)
+        first, last = BaseSchema._docstring_rows(textwrap.dedent(''.join(lines)))
+        body_lines = [line for ix, line in enumerate(lines, 1) if ix < first or ix > last]
         return ''.join(body_lines).strip()
 
+    @staticmethod
+    def _docstring_rows(src: str) -> tuple:
+        """
+        Returns the first and last source row of the function docstring, which is
+        the first token after the body INDENT if it is a string, else (0, -1).
+        """
+        body = False
+        for tok in tokenize.generate_tokens(io.StringIO(src).readline):
+            if tok.type == tokenize.INDENT:
+                body = True
+            elif body and tok.type not in (tokenize.NL, tokenize.COMMENT):
+                if tok.type == tokenize.STRING:
+                    return tok.start[0], tok.end[0]
+                break
+        return 0, -1
+
     @staticmethod
     def handle_returns_inspect(func: Callable) -> str:
         """
         Map the Python return-annotation to a JSON-Schema primitive.
         Falls back to ``object`` or the raw string if no match is found.
         """
-        py2json: dict[type, str] = {
-            str: "string",
-            int: "integer",
-            float: "number",
-            bool: "boolean",
-            list: "array",
-            dict: "object",
-            type(None): "null",
-        }
         ann = inspect.signature(func).return_annotation
         if ann is inspect._empty:
             return "object"
-        return py2json.get(ann, str(ann))
+        return _PY2JSON.get(ann, str(ann))
 
     def to_dict(self) -> dict:
         return self.__dict__
@@ -114,7 +143,7 @@ class OpenaiSchema:
             for name, meta in parsed_props.items()
         }
 
-        full_src = textwrap.dedent(inspect.getsource(main_meth).strip())
+        full_src = textwrap.dedent(''.join(get_source_lines(main_meth)).strip())
 
         return cls(
             name=main_meth.__qualname__,
@@ -216,7 +245,9 @@ class FunctionToJson:
         for schema in self.schemas:
             try:
                 sch = getattr(sys.modules[__name__], f"{schema.capitalize()}Schema")
-                self.asts[schema] = sch.set_fields(*args, deepcopy(meth_props) ).to_dict()
+                # schemas only add keys to the per-parameter dicts, so copy those
+                props = {name: dict(meta) for name, meta in meth_props.items()}
+                self.asts[schema] = sch.set_fields(*args, props).to_dict()
             except AttributeError:
                 raise AttributeError(f"Schema class '{schema}' not found in module.")
 
@@ -226,14 +257,12 @@ class FunctionToJson:
         Build a JSON-Schema-ready properties map.
         Skips implicit parameters and *args/**kwargs.
         """
-        PY2JSON = {str: "string", int: "integer", float: "number",
-                   bool: "boolean", list: "array", dict: "object"}
         props: Dict[str, Dict[str, object]] = {}
         for name, p in inspect.signature(func).parameters.items():
             if name in {"self", "cls"} or p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD):
                 continue
             ann = p.annotation if p.annotation is not inspect._empty else object
-            json_type = PY2JSON.get(ann, "object")
+            json_type = _PY2JSON.get(ann, "object")
             props[name] = {
                 "type": json_type,
                 "default": None if p.default is inspect._empty else p.default,
@@ -251,11 +280,11 @@ class FunctionToJson:
             if not file_name.endswith(".json"):
                 file_name += ".json"
             with open(os.path.join(sts.apis_json_dir, file_name), "w") as f:
-                f.write(json.dumps(self.asts, indent=4, default=default_serializer))
+                json.dump(self.asts, f, indent=4, default=default_serializer)
 
     @staticmethod
     def parse_docstring(docstring):
-        args_section = re.search(r'Args:\n\s+(.*?)(\n\n|\Z)', docstring or '', re.DOTALL)
+        args_section = _RX_ARGS_SECTION.search(docstring or '')
         if not args_section:
             return {}
         args_text = args_section.group(1)
@@ -269,7 +298,7 @@ class FunctionToJson:
                 if current_arg:
                     args[current_arg].setdefault('options', []).append(line[2:])
             else:
-                arg_match = re.match(r'(\w+) \((.+?)\): (.+)', line)
+                arg_match = _RX_ARG_LINE.match(line)
                 if arg_match:
                     if current_arg and not options_found:
                         args[current_arg]['options'] = None
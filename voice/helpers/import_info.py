@@ -1,5 +1,8 @@
 import ast
+import fnmatch
+import functools
 import os
+import re
 import graphviz
 import argparse
 
@@ -14,6 +17,46 @@ ignore_dirs = {
                 ".pytest_cache",    
                 ".tox",
 }
+# ignore_dirs may hold glob patterns like "*.egg-info", so match them as one regex
+_IGNORE_RX = re.compile("|".join(fnmatch.translate(d) for d in sorted(ignore_dirs)))
+
+def prune_dirs(dirs):
+    """
+    Remove ignored directories from an os.walk dirs list in place.
+    """
+    dirs[:] = [d for d in dirs if not _IGNORE_RX.match(d)]
+
+def find_file(search_dir, filename):
+    """
+    Depth-first scandir search (os.walk order) for the first directory holding
+    filename. DirEntry carries cached type bits, so no extra stat per entry.
+    """
+    stack = [search_dir]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+            elif entry.name == filename:
+                return current
+        prune_dirs(subdirs)
+        stack.extend(os.path.join(current, d) for d in reversed(subdirs))
+    return None
+
+@functools.lru_cache(maxsize=2048)
+def _parse(filepath, mtime_ns):
+    """
+    Parse a source file once per modification time. Bytes are handed to ast.parse
+    so the tokenizer handles the encoding cookie itself.
+    """
+    with open(filepath, 'rb') as file:
+        return ast.parse(file.read(), filepath)
 
 class PackageInfo:
     def __init__(self, main_file: str, *args, **kwargs):
@@ -21,6 +64,9 @@ class PackageInfo:
         if not self.root_dir:
             raise RuntimeError("Root directory not found.")
         self.main_file = main_file
+        # file name -> paths index of root_dir, walked once and shared by all lookups
+        self._file_index = self.index_files(self.root_dir)
+        self._file_paths = {p for paths in self._file_index.values() for p in paths}
         self.graph = graphviz.Digraph(comment='Package Dependency Graph')
         self.visited_files = set()
         self.incoming_edges = {}  # Track incoming edges for each node
@@ -32,11 +78,8 @@ class PackageInfo:
         """
         Determine the root directory of a Python project by locating __main__.py.
         """
-        for root, dirs, files in os.walk(os.getcwd()):
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
-            if '__main__.py' in files:
-                return os.path.split(root)
-        return None
+        root = find_file(os.getcwd(), '__main__.py')
+        return os.path.split(root) if root else None
 
     def build_graph(self, filepath):
         filename = os.path.basename(filepath)
@@ -98,8 +141,7 @@ class PackageInfo:
         """
         Parse a Python file and extract all local import statements relevant to the package.
         """
-        with open(filepath, 'r') as file:
-            tree = ast.parse(file.read(), filepath)
+        tree = _parse(filepath, os.stat(filepath).st_mtime_ns)
         imports = []
         for node in ast.walk(tree):
             if isinstance(node, ast.Import):
@@ -122,21 +164,38 @@ class PackageInfo:
         module_parts = module_path.split('.')
         for i in range(len(module_parts), 0, -1):
             potential_path = os.path.join(self.root_dir, *module_parts[:i]) + '.py'
-            potential_rel = os.path.relpath(potential_path, self.root_dir)
-            if os.path.exists(potential_path):
+            # the index misses files under pruned dirs and is case sensitive on Windows
+            if potential_path in self._file_paths or os.path.exists(potential_path):
                 return potential_path
             else:
                 pass
         return None
 
+    @staticmethod
+    def index_files(search_dir):
+        """
+        Walk search_dir once and map each file name to its paths in walk order.
+        """
+        index = {}
+        # os.fwalk lists each level through an open dir fd, Windows falls back to os.walk
+        walk = os.fwalk if hasattr(os, 'fwalk') else os.walk
+        for root, dirs, files, *_ in walk(search_dir):
+            prune_dirs(dirs)
+            # same result as os.path.join(root, file), without a call per file
+            prefix = root if root.endswith(os.sep) else root + os.sep
+            for file in files:
+                index.setdefault(file, []).append(prefix + file)
+        return index
+
     def locate_file(self, filename, search_dir):
         """
         Recursively locate a specific file within a given directory.
+        Lookups in root_dir are served from the file index.
         """
-        for root, dirs, files in os.walk(search_dir):
-            if filename in files:
-                return os.path.join(root, filename)
-        return None
+        if search_dir == self.root_dir:
+            return self._file_index.get(filename, [None])[0]
+        root = find_file(search_dir, filename)
+        return os.path.join(root, filename) if root else None
 
 def set_params(*args, **kwargs):
     parser = argparse.ArgumentParser(description="Analyze Python package structure and visualize import relationships.")
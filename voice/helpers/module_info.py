@@ -4,10 +4,19 @@ module creation and maintenance plus sample module style template
 """
 
 # standard imports are inline in alpabetical order
-import os, re, time
+import functools, os, re, time
 # settings import is almost always required
 import voice.settings as sts
 
+# trailing newlines of a module_doc_str, collapsed to a single one
+_TRAIL_NL = re.compile(r'\n*$', flags=re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=128)
+def _file_name_rx(module_name: str) -> re.Pattern:
+    # module_doc_str first line holding the file name, with optional comment prefix
+    return re.compile(r'^\s*#?\s*' + re.escape(module_name), flags=re.MULTILINE)
+
 
 class Module:
 
@@ -81,13 +90,12 @@ class Module:
             module_doc_str = f'# {os.path.basename(self.module_path)}\n'
 
         def allign_file_name(module_doc_str: str, module_name: str) -> str:
-            pattern = r'^\s*#?\s*' + re.escape(module_name)
             replacement = f'\n{module_name}'
-            formatted_doc_str = re.sub(pattern, replacement, module_doc_str, flags=re.MULTILINE)
+            formatted_doc_str = _file_name_rx(module_name).sub(replacement, module_doc_str)
             return formatted_doc_str
         module_doc_str = allign_file_name(module_doc_str, os.path.basename(self.module_path))
         # remove trailing newlines
-        module_doc_str = re.sub(r'\n*$', '\n', module_doc_str, flags=re.MULTILINE)
+        module_doc_str = _TRAIL_NL.sub('\n', module_doc_str)
         self.module_doc_str = f'"""{module_doc_str}"""'
         return self.module_doc_str
 
@@ -1,7 +1,8 @@
 # package_info.py
-import os, re, time
+import functools, os, re, time
 import voice.settings as sts
-from voice.helpers.collections import temp_chdir
+from voice.helpers.collections import strip_ansi_codes, temp_chdir
+from voice.helpers.tree import mk_stub_file, scan_dirs
 from colorama import Fore, Style
 
 ignoreDirs = {
@@ -23,44 +24,35 @@ dir_discontinued_raw =  f"|..."
 dir_discontinued =  f"{Style.DIM}{Fore.WHITE}{dir_discontinued_raw}{Style.RESET_ALL}"
 file_color = lambda file: Fore.BLUE if file.endswith(".py") else ""
 indent = "    "
+_empty_lines = re.compile(r"\n{2,}")
 
 def dirs_to_tree(projectDir, *args, ignores:set=set(), **kwargs):
     global ignoreDirs
     ignoreDirs = ignoreDirs | ignores
-    prStruct = f"{start_token}\n"
-    baseLevel = projectDir.count(os.sep)
-    for root, dirs, files in os.walk(projectDir):
-        level = root.count(os.sep) - baseLevel
-        subdir = os.path.basename(root)
-
-        # Check if the directory should be ignored
-        ignoreDir = any(
-            subdir.endswith(igDir.lstrip("*")) if igDir.startswith("*") else subdir == igDir
-            for igDir in ignoreDirs
-        )
-        if ignoreDir:
-            prStruct += (
-                f"{indent * level}{dir_conn}{dir_symbol}{subdir}\n"
-                f"{indent * (level + 1)}{dir_discontinued}\n"
-            )
-            dirs[:] = []  # Prevent further traversal into this directory
+    out = [start_token]
+    # Ignored directories are emitted folded and never listed
+    isIgnored = lambda subdir, level: subdir in ignoreDirs or any(
+        subdir.endswith(igDir.lstrip("*")) for igDir in ignoreDirs if igDir.startswith("*")
+    )
+    for root, subdir, level, dirs, files in scan_dirs(projectDir, skip=isIgnored):
+        if dirs is None:
+            out.append(f"{indent * level}{dir_conn}{dir_symbol}{subdir}")
+            out.append(f"{indent * (level + 1)}{dir_discontinued}")
         else:
-            prStruct += f"{indent * level}{dir_conn}{dir_symbol}{subdir}\n"
+            out.append(f"{indent * level}{dir_conn}{dir_symbol}{subdir}")
             indentOn = indent * (level + 1)
             logDir = subdir.endswith("log") or subdir.endswith("logs")
             printFiles = False
 
-            for file in files:
+            for file in (f.name for f in files):
                 if logDir and printFiles:
-                    prStruct += f"{indentOn}{dir_discontinued}\n"
+                    out.append(f"{indentOn}{dir_discontinued}")
                     break
-                prStruct += f"{indentOn}{file_conn}{file_color(file)}{file}{Style.RESET_ALL}\n"
+                out.append(f"{indentOn}{file_conn}{file_color(file)}{file}{Style.RESET_ALL}")
                 printFiles = True
 
-            # Update dirs for next iteration, excluding current ignored directory
-            if ignoreDir:
-                dirs[:] = []
-    return prStruct + f"{end_token}\n"
+    out.append(end_token)
+    return "\n".join(out) + "\n"
 
 def tree_to_dirs(tree, *args, **kwargs):
     """
@@ -105,7 +97,7 @@ def tree_to_dirs(tree, *args, **kwargs):
         take a line from dirs_to_tree and cleanup the line
         """
         line = line.strip()
-        is_dir = True if line.startswith(dir_conn) else False
+        is_dir = line.startswith(dir_conn)
         # remove connectors conn
         line = line.replace(dir_discontinued, "")
         line = line.replace(dir_conn, '').replace(file_conn, '')
@@ -139,14 +131,11 @@ def tree_to_dirs(tree, *args, **kwargs):
     return _parse_tree(tree, *args, **kwargs)
 
 def _decolorize(line, *args, **kwargs):
-    line = line.replace(Fore.YELLOW, "").replace(Fore.BLUE, "").replace(Fore.GREEN, "")
-    line = line.replace(Style.DIM, "").replace(Fore.WHITE, "").replace(Style.RESET_ALL, "")
-    return line
+    return strip_ansi_codes(line)
 
 def _decolorize_tree(tree, *args, **kwargs):
-    lines = [line for line in tree.split("\n") if line]
-    decolorized = '\n'.join([_decolorize(line, *args, **kwargs) for line in lines])
-    return decolorized
+    # drop empty lines, then strip all color codes in one pass over the whole tree
+    return strip_ansi_codes(_empty_lines.sub("\n", tree).strip("\n"))
 
 def mk_dirs_hierarchy(dirs:list[list], tgt_path:str, *args, **kwargs) -> None:
     """
@@ -155,15 +144,19 @@ def mk_dirs_hierarchy(dirs:list[list], tgt_path:str, *args, **kwargs) -> None:
     if the tgt_path is a file, it will be created with a comment as temporary content
     """
     with temp_chdir(tgt_path):
+        # dirs first, then stub files in one os.open/os.write each
         for path, is_dir in dirs:
-            if not os.path.exists(path):
-                if is_dir:
+            if is_dir:
+                try:
                     os.makedirs(path)
-                else:
-                    with open(path, "w") as f:
-                        f.write(f"#{os.path.basename(path)}\n\n")
+                except FileExistsError:
+                    pass
+        for path, is_dir in dirs:
+            if not is_dir:
+                mk_stub_file(path)
 
 # project environment info
+@functools.lru_cache(maxsize=None)
 def pipenv_is_active(exec_path, *args, **kwargs):
     """
     check if the environment is active 
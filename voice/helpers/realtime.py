@@ -0,0 +1,29 @@
+# realtime.py
+import os, sys
+
+# above normal threads, below THREAD_PRIORITY_TIME_CRITICAL (15) which would
+# starve the gui and input hooks if decoding ever falls behind
+_WIN_THREAD_PRIORITY_HIGHEST = 2
+# low SCHED_FIFO priority, enough to preempt normal SCHED_OTHER threads
+_FIFO_PRIORITY = 10
+
+
+def boost_thread_priority(*args, **kwargs) -> bool:
+    """
+    Raises the scheduling priority of the calling thread, used for the audio
+    decoding thread so gui and polling threads do not delay it.
+    Returns False if the platform or missing privileges do not allow it.
+    """
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(),
+                                               _WIN_THREAD_PRIORITY_HIGHEST))
+    if hasattr(os, "sched_setscheduler"):
+        # on linux pid 0 addresses the calling thread, not the whole process
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(_FIFO_PRIORITY))
+            return True
+        except (OSError, ValueError):
+            return False
+    return False
@@ -0,0 +1,46 @@
+# tones.py
+import array, io, math, os, wave
+
+RATE = 22050
+# status signals as sequences of tone frequencies in Hz
+SEQUENCES = {
+    "LOADED": (800,),
+    "START": (600, 1000),
+    "STOP": (1000, 600),
+}
+
+
+def tone_wav(freqs: tuple, *args, duration_ms: int = 150, rate: int = RATE,
+             volume: float = 0.5, **kwargs) -> bytes:
+    """
+    Renders consecutive sine tones of duration_ms each into mono 16 bit wav bytes.
+    """
+    n = rate * duration_ms // 1000
+    amp = volume * 32767
+    samples = array.array("h")
+    for freq in freqs:
+        step = 2 * math.pi * freq / rate
+        samples.extend(int(amp * math.sin(step * i)) for i in range(n))
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+def tone_files(target_dir: str, *args, **kwargs) -> dict:
+    """
+    Writes one wav per status in SEQUENCES to target_dir, once, and returns
+    {status: path}. Files allow asynchronous playback, memory sounds do not.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    paths = {}
+    for status, freqs in SEQUENCES.items():
+        path = os.path.join(target_dir, f"{status.lower()}.wav")
+        if not os.path.isfile(path):
+            with open(path, "wb") as f:
+                f.write(tone_wav(freqs, *args, **kwargs))
+        paths[status] = path
+    return paths
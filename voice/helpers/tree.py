@@ -6,42 +6,168 @@ WHY: Minimal, consistent tree builder that honors sts.* settings:
 - Colorization is optional and isolated.
 """
 
-import os, re, fnmatch, contextlib  # stdlib only, fast imports
-from typing import Set, List, Tuple, Dict, Iterable, Optional
-from colorama import Fore, Style
+import os, re, fnmatch, contextlib, functools  # stdlib only, fast imports
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Iterable, Iterator, Optional
 
 import voice.settings as sts
 
 
-try:
-    # Optional helper for atomic chdir during mk_dirs_hierarchy
-    from voice.helpers.collections import temp_chdir as _temp_chdir
-except Exception:
-    @contextlib.contextmanager
-    def _temp_chdir(path: str):
-        """
-        WHY: Fallback chdir ctx mgr; used only if voice helper is absent.
-        """
-        cwd = os.getcwd()
-        try:
-            os.chdir(path)
-            yield
-        finally:
-            os.chdir(cwd)
-
-
+@contextlib.contextmanager
+def _temp_chdir(path: str):
+    """
+    WHY: chdir ctx mgr for mk_dirs_hierarchy, same as collections.temp_chdir,
+    which is not imported because collections loads yaml, tabulate and colorama.
+    """
+    cwd = os.getcwd()
+    try:
+        os.chdir(path)
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+# sts dir sets are fixed after import, share them instead of copying per call
+_DEFAULT_IGNORES = frozenset(getattr(sts, "ignore_dirs", ()))
+_ABBREV = frozenset(getattr(sts, "abrev_dirs", ()))
+
+
+@functools.lru_cache(maxsize=32)
+def _ignore_rules(ignores: frozenset) -> tuple:
+    """
+    WHY: Compile ignore_dirs once per set: (exact, suffixes, glob match or None).
+    A "*foo" or plain "foo" pattern also matches as a suffix, as before.
+    """
+    suffixes = tuple(p.lstrip("*") for p in ignores)
+    # "*X" is fully covered by the suffix test, only real globs need the regex
+    globs = [p for p in ignores if any(c in p.lstrip("*") for c in "*?[")]
+    glob_re = re.compile(
+        "|".join(fnmatch.translate(os.path.normcase(p)) for p in globs)
+    ).match if globs else None
+    return frozenset(ignores), suffixes, glob_re
+
+
+def scan_dirs(path: str, level: int = 0, name: str | None = None, skip=None):
+    """
+    WHY: os.walk(topdown=True) order from a single os.scandir pass per dir.
+    Yields (root, name, level, dirs, files) with DirEntry lists; clearing
+    dirs in place prunes the subtree. Symlinked dirs are listed, not entered.
+    Dirs for which skip(name, level) is true are yielded as (.., None, None)
+    without being listed at all.
+    """
+    name = name or os.path.basename(path)
+    if skip is not None and skip(name, level):
+        yield path, name, level, None, None
+        return
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    dirs = [e for e in entries if e.is_dir()]
+    files = [e for e in entries if not e.is_dir()]
+    yield path, name, level, dirs, files
+    for d in dirs:
+        if not d.is_symlink():
+            yield from scan_dirs(d.path, level + 1, d.name, skip)
+
+
+# "col" codes are filled in by _colors, uncolored trees only need the symbols
 styles_dict: Dict[str, Dict[str, Dict[str, object]]] = {
     "default": {
-        "dir":  {"sym": "|--",  "col": f"{Fore.WHITE}"},
-        "file": {"sym": "|-",   "col": f"{Fore.WHITE}"},
-        "fold": {"sym": "▼",    "col": f"{Fore.YELLOW}"},
-        "disc": {"sym": "|...", "col": f"{Style.DIM}{Fore.WHITE}"},
-        "ext":  {"sym": [".py"], "col": [f"{Fore.BLUE}"]},
+        "dir":  {"sym": "|--"},
+        "file": {"sym": "|-"},
+        "fold": {"sym": "▼"},
+        "disc": {"sym": "|..."},
+        "ext":  {"sym": [".py"]},
     },
 }
 
 
+@functools.lru_cache(maxsize=1)
+def _colors() -> tuple:
+    """
+    WHY: Import colorama on first use and add the "col" codes to styles_dict,
+    so uncolored trees never load it. Returns (Fore, Style).
+    """
+    from colorama import Fore, Style
+    cols = {
+        "dir":  f"{Fore.WHITE}",
+        "file": f"{Fore.WHITE}",
+        "fold": f"{Fore.YELLOW}",
+        "disc": f"{Style.DIM}{Fore.WHITE}",
+        "ext":  [f"{Fore.BLUE}"],
+    }
+    for st in styles_dict.values():
+        for name, m in st.items():
+            m.setdefault("col", cols[name])
+    return Fore, Style
+
+
+@functools.lru_cache(maxsize=8)
+def _colorizer(style: str) -> tuple:
+    """
+    WHY: One regex over all style symbols (longest first) plus one for the
+    colored file extensions, so a tree is colorized in a single sub pass.
+    Returns (sub, repl).
+    """
+    _, Style = _colors()
+    st = styles_dict.get(style, styles_dict["default"])
+    syms: Dict[str, str] = {}
+    exts: Dict[str, str] = {}
+    for name, m in st.items():
+        if name == "ext":
+            exts.update(zip(m["sym"], m["col"]))
+        else:
+            syms[m["sym"]] = m["col"]
+    parts = [re.escape(sym) for sym in sorted(syms, key=len, reverse=True)]
+    if exts:
+        sfxs = "|".join(re.escape(e) for e in sorted(exts, key=len, reverse=True))
+        parts.append(rf"\S*(?:{sfxs})")
+
+    def repl(m: re.Match) -> str:
+        txt = m.group()
+        col = syms.get(txt)
+        if col is None:
+            col = next(c for sfx, c in exts.items() if txt.endswith(sfx))
+        return f"{col}{txt}{Style.RESET_ALL}"
+
+    return re.compile("|".join(parts)).sub, repl
+
+
+# any SGR sequence, covers every Fore/Style code colorama emits
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+
+_STUB_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def mk_stub_file(path: str) -> bool:
+    """
+    WHY: Create a '#<name>' stub with one open/write/close and no prior stat;
+    O_EXCL leaves existing paths untouched. Returns False if path existed.
+    """
+    try:
+        fd = os.open(path, _STUB_FLAGS, 0o644)
+    except FileExistsError:
+        return False
+    try:
+        name = os.path.basename(path)
+        os.write(fd, f"#{name}{os.linesep}{os.linesep}".encode("utf-8"))
+    finally:
+        os.close(fd)
+    return True
+
+
+def _decode(data: bytes, errors: str = "strict") -> str:
+    """
+    WHY: utf-8 decode with text-mode universal newlines, as open(..., "r") reads.
+    """
+    return data.decode("utf-8", errors).replace("\r\n", "\n").replace("\r", "\n")
+
+
 class Tree:
+    # upper bound for file bytes kept from the walk for load_matched_files
+    max_cached_bytes: int = 64 * 1024 * 1024
     file_types: Dict[str, str] = {
         ".py": "Python", ".yml": "YAML", ".yaml": "YAML",
         ".md": "Markdown", ".txt": "Text",
@@ -52,9 +178,25 @@ class Tree:
         WHY: One Tree to render hierarchy, collect matches, and read content.
         """
         self._apply_style(*args, style=style, **kwargs)
+        # (suffix, type) longest first, so nested suffixes resolve to the longest
+        self._ext_lookup = tuple(
+            sorted(self.file_types.items(), key=lambda kv: len(kv[0]), reverse=True)
+        )
+        # (min_show_level, substring search) per sts.ignore_files bucket
+        self._file_rules = [
+            (lvl, re.compile("|".join(map(re.escape, pats)), re.IGNORECASE).search)
+            for lvl, pats in getattr(sts, "ignore_files", {}).items() if pats
+        ]
         self.indent = "    "
+        # per-line invariants, rendered lines are indent + prefix + name
+        self._indents = [self.indent * i for i in range(32)]
+        self._dir_prefix = f"{self.dir_sym}{self.fold_sym} "
+        self._file_prefix = f"{self.file_sym} "
+        self._disc_prefix = f"{self.disc_sym} {self.fold_sym} "
         self.matched_files: List[str] = []
         self.loaded_files: List[str] = []
+        self._file_cache: Dict[str, bytes] = {}
+        self._cached_bytes = 0
         self.verbose = self.handle_verbosity(*args, **kwargs)
         self._out: Optional[List[str]] = None
 
@@ -80,6 +222,7 @@ class Tree:
         WHY: Verbosity controls content-dump depth; confirm very large dumps.
         """
         if verbose >= 7:
+            Fore, Style = _colors()
             print(f"{Fore.YELLOW}WARNING: {verbose = } "
                   f"Output might excede the console length!{Style.RESET_ALL}"
                   f"{Style.RESET_ALL}")
@@ -92,8 +235,7 @@ class Tree:
     def _apply_style(self, *args, style: str, **kwargs) -> None:
         st = styles_dict.get(style, styles_dict["default"])
         for name, style_map in st.items():
-            for k, v in style_map.items():
-                setattr(self, f"{name}_{k}", v)
+            setattr(self, f"{name}_sym", style_map["sym"])
 
     # --- public API ---------------------------------------------------------
 
@@ -113,35 +255,33 @@ class Tree:
         """
         self.matched_files.clear()
         self.loaded_files.clear()
+        self._file_cache.clear()
+        self._cached_bytes = 0
         if project_dir is None and args and isinstance(args[0], str):
             project_dir = args[0]
         prj = project_dir or getattr(sts, "project_dir", os.getcwd())
-        ign = set(ignores) if ignores else set(getattr(sts, "ignore_dirs", set()))
+        ign = _ignore_rules(frozenset(ignores) if ignores else _DEFAULT_IGNORES)
         self.matched_files.clear()
 
+        match = re.compile(file_match_regex) if file_match_regex else None
         tree, contents = ["<hierarchy>"], ["<file_contents>"]
         self._out = tree
-        base_level = prj.count(os.sep)
-
-        for root, dirs, files in os.walk(prj, topdown=True):
-            level = root.count(os.sep) - base_level
-            subdir = os.path.basename(root)
-            ind = self.indent * level
 
-            if self._is_ignored(subdir, ign):
-                tree.append(f"{ind}{self.disc_sym} {self.fold_sym} {subdir}")
-                dirs[:] = []
-                continue
+        # ignored and too deep dirs are folded without ever being listed
+        skip = lambda name, level: (
+            self._is_ignored(name, ign) or (max_depth is not None and level >= max_depth)
+        )
+        for root, subdir, level, dirs, files in scan_dirs(prj, skip=skip):
+            ind = self._indent(level)
 
-            if max_depth is not None and level >= max_depth:
-                tree.append(f"{ind}{self.disc_sym} {self.fold_sym} {subdir}")
-                dirs[:] = []
+            if dirs is None:
+                tree.append(ind + self._disc_prefix + subdir)
                 continue
 
-            tree.append(f"{ind}{self.dir_sym}{self.fold_sym} {subdir}")
+            tree.append(ind + self._dir_prefix + subdir)
             self._emit_files(
                 *args, root=root, files=files, ind=ind, level=level,
-                file_match_regex=file_match_regex, contents=contents, **kwargs,
+                file_match_regex=match, contents=contents, **kwargs,
             )
 
         tree.append("</hierarchy>")
@@ -161,32 +301,40 @@ class Tree:
         self,
         *args,
         root: str,
-        files: Iterable[str],
+        files: Iterable[os.DirEntry],
         ind: str,
         level: int,
-        file_match_regex: Optional[str],
+        file_match_regex: Optional[re.Pattern],
         contents: List[str],
         **kwargs,
     ) -> None:
         log_dir = self._is_abbrev_dir(root, *args, **kwargs)
+        sub_ind = self._indent(level + 1)
+        file_prefix = sub_ind + self._file_prefix
         listed = 0
-        for f in files:
+        for entry in files:
             if log_dir and listed >= 1:
-                self._line(f"{ind}{self.indent}{self.disc_sym}", *args, **kwargs)
+                self._line(sub_ind + self.disc_sym, *args, **kwargs)
                 break
-            self._line(f"{ind}{self.indent}{self.file_sym} {f}", *args, **kwargs)
-            full = os.path.join(root, f)
+            f, full = entry.name, entry.path
+            self._line(file_prefix + f, *args, **kwargs)
 
-            if file_match_regex and re.search(file_match_regex, f):
+            matched = bool(file_match_regex and file_match_regex.search(f))
+            if matched:
                 self._track_match(*args, path=full, **kwargs)
 
             if self.verbose > level:
                 if self._ignored_file(f, *args, **kwargs):
                     listed += 1
                     continue
-                fc = self.load_file_content(*args, file_path=full, **kwargs)
+                # read once, matched files keep their bytes for load_matched_files
+                data = self._read_bytes(full)
+                if matched and data is not None:
+                    self._cache_file(full, data)
+                fc = "" if data is None else _decode(data, "ignore")
                 self.loaded_files.append(full)
 
+                Fore, _ = _colors()
                 contents.append(
                     f"{Fore.CYAN}\n<file name='{f}' path='{full}'>{Fore.RESET}\n{fc}"
                 )
@@ -208,6 +356,20 @@ class Tree:
         p = self.matched_files.pop(idx)
         self.matched_files.insert(0, p)
 
+    def iter_matched_files(
+        self,
+        *args,
+        default_ignore_files: Iterable[str] | None = None,
+        **kwargs,
+    ) -> Iterator[str]:
+        """
+        WHY: Lazily yield matched paths, skipping default_ignore_files prefixes.
+        """
+        prefixes = tuple(default_ignore_files or ())
+        for p in self.matched_files:
+            if not (prefixes and p.startswith(prefixes)):
+                yield p
+
     def load_matched_files(
         self,
         *args,
@@ -218,32 +380,52 @@ class Tree:
         WHY: Load content for matched files; optional path-prefix filter.
         """
         sel: List[dict] = []
-        prefixes = tuple(default_ignore_files or ())
-        for p in self.matched_files:
-            if prefixes and p.startswith(prefixes):
-                continue
-            try:
-                with open(p, "r", encoding="utf-8") as fh:
-                    c = fh.read()
-            except UnicodeDecodeError:
+        paths = list(self.iter_matched_files(default_ignore_files=default_ignore_files))
+        if not paths:
+            return sel
+        # reads are I/O bound, map keeps the matched_files order
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as ex:
+            read = list(ex.map(self._read_matched, paths))
+        for p, c in zip(paths, read):
+            if c is None:
+                Fore, _ = _colors()
                 print(f"{Fore.RED}Error reading file: {p}{Fore.RESET}")
                 continue
-            ext = os.path.splitext(p)[1]
-            ftype = self.file_types.get(ext, "Text")
+            ftype = next((t for sfx, t in self._ext_lookup if p.endswith(sfx)), "Text")
             sel.append({"file_path": p, "file_type": ftype, "file_content": c})
         return sel
 
     # --- helpers: ignore / abbrev / IO -------------------------------------
 
-    def _is_ignored(self, subdir: str, ignores: Set[str], *args, **kwargs) -> bool:
+    def _read_matched(self, path: str) -> Optional[str]:
+        """
+        WHY: Thread-pool worker for load_matched_files; None if not utf-8.
+        Files already read during the walk come from _file_cache.
+        """
+        data = self._file_cache.get(path)
+        try:
+            if data is not None:
+                return _decode(data)
+            with open(path, "r", encoding="utf-8") as fh:
+                return fh.read()
+        except UnicodeDecodeError:
+            return None
+
+    def _cache_file(self, path: str, data: bytes) -> None:
+        if self._cached_bytes + len(data) <= self.max_cached_bytes:
+            self._file_cache[path] = data
+            self._cached_bytes += len(data)
+
+    def _is_ignored(self, subdir: str, ignores: tuple, *args, **kwargs) -> bool:
         """
         WHY: Support exact matches, suffix-like, and glob patterns.
+        ignores are the precompiled rules from _ignore_rules.
         """
-        return any(
-            subdir == pat
-            or subdir.endswith(pat.lstrip("*"))
-            or fnmatch.fnmatch(subdir, pat)
-            for pat in ignores
+        exact, suffixes, glob_match = ignores
+        return (
+            subdir in exact
+            or subdir.endswith(suffixes)
+            or (glob_match is not None and glob_match(os.path.normcase(subdir)) is not None)
         )
 
     def _ignored_file(self, fname: str, *args, **kwargs) -> bool:
@@ -252,10 +434,8 @@ class Tree:
         Rule: if self.verbose < level and any(pattern in name) -> ignore.
         Case-insensitive for robustness.
         """
-        rules: dict[int, set[str]] = getattr(sts, "ignore_files", {})
-        f = fname.casefold()
-        for min_show_level, pats in rules.items():
-            if self.verbose < min_show_level and any(p.casefold() in f for p in pats):
+        for min_show_level, search in self._file_rules:
+            if self.verbose < min_show_level and search(fname):
                 return True
         return False
 
@@ -263,21 +443,34 @@ class Tree:
         """
         WHY: Abbreviate directory listing if leaf name is in sts.abrev_dirs.
         """
-        sub = os.path.basename(root)
-        abr = set(getattr(sts, "abrev_dirs", set()))
-        return sub in abr
+        return os.path.basename(root) in _ABBREV
 
     def load_file_content(self, *args, file_path: str, **kwargs) -> str:
         """
         WHY: Read file as text, suppress noisy errors unless verbose>=1.
         """
+        data = self._read_bytes(file_path)
+        return "" if data is None else _decode(data, "ignore")
+
+    def _read_bytes(self, file_path: str) -> Optional[bytes]:
+        """
+        WHY: Raw read shared by contents and the match cache; None on error.
+        """
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            with open(file_path, "rb") as f:
                 return f.read()
         except Exception as e:
             if self.verbose >= 1:
+                Fore, _ = _colors()
                 print(f"{Fore.RED}Read error:{Fore.RESET} {e}")
-            return ""
+            return None
+
+    def _indent(self, level: int) -> str:
+        """
+        WHY: Precomputed indent for level, computed only beyond the table.
+        """
+        indents = self._indents
+        return indents[level] if level < len(indents) else self.indent * level
 
     def _line(self, s: str, *args, **kwargs) -> None:
         """
@@ -293,37 +486,14 @@ class Tree:
         """
         WHY: Inject ANSI colors based on style symbols and file extensions.
         """
-        st = styles_dict.get(style, styles_dict["default"])
-        out: List[str] = []
-        for line in tree.split("\n"):
-            for name, m in st.items():
-                sym, col = m.values()
-                if name == "ext":
-                    for sfx, c in zip(sym, col):
-                        line = re.sub(
-                            rf"(\S*{re.escape(sfx)})",
-                            f"{c}\\1{Style.RESET_ALL}",
-                            line,
-                        )
-                else:
-                    line = line.replace(sym, f"{col}{sym}{Style.RESET_ALL}")
-            out.append(line)
-        return "\n".join(out).strip()
+        sub, repl = _colorizer(style)
+        return sub(repl, tree).strip()
 
     def uncolorize(self, tree: str, *args, **kwargs) -> str:
         """
         WHY: Strip basic Colorama sequences from a rendered tree.
         """
-        cols = [
-            Fore.YELLOW, Fore.GREEN, Fore.RED, Fore.BLUE, Fore.CYAN,
-            Fore.WHITE, Style.RESET_ALL, Style.DIM, Style.RESET_ALL,
-        ]
-        out = []
-        for line in tree.split("\n"):
-            for c in cols:
-                line = line.replace(c, "")
-            out.append(line)
-        return "\n".join(out).strip()
+        return _ANSI_RE.sub("", tree).strip()
 
     def _normalize_tree(self, tree: str, *args, **kwargs) -> str:
         """
@@ -333,8 +503,17 @@ class Tree:
         if not lines:
             return ""
         pad = self.indent
-        levels = [len(l) - len(l.lstrip(pad)) for l in lines if l.strip()]
-        min_ind = min(levels) if levels else 0
+        # running min, left-aligned input stops at the first unindented line
+        min_ind = None
+        for l in lines:
+            if not l.strip():
+                continue
+            ind = len(l) - len(l.lstrip(pad))
+            if min_ind is None or ind < min_ind:
+                min_ind = ind
+                if min_ind == 0:
+                    break
+        min_ind = min_ind or 0
         norm = [l[min_ind:] if l.strip() else l for l in lines]
         return "\n".join(norm).strip()
 
@@ -348,15 +527,15 @@ class Tree:
             line = line.replace(s, "")
         return line.strip(), is_dir
 
-    def parse_tree(self, tree: str, *args, **kwargs) -> List[Tuple[str, bool]]:
+    def parse_tree(self, tree: str, *args, **kwargs) -> Iterator[Tuple[str, bool]]:
         """
         WHY: Convert textual tree into (path, is_dir) tuples for mk_dirs_hierarchy.
+        Lazily yielded, wrap in list() if the result is needed more than once.
         """
-        paths: List[Tuple[str, bool]] = []
         temps: List[str] = []
         norm = self._normalize_tree(tree, *args, **kwargs)
         for line in norm.split("\n"):
-            if not line or line.startswith(self.disc_sym) or line.startswith("<"):
+            if not line or line.startswith((self.disc_sym, "<")):
                 continue
             level = line.count(self.indent)
             txt, is_dir = self._cleanup_line(line, *args, **kwargs)
@@ -366,8 +545,7 @@ class Tree:
                 temps.append(txt)
             else:
                 temps = temps[:level] + [txt]
-            paths.append((os.path.join(*temps), is_dir))
-        return paths
+            yield os.path.join(*temps), is_dir
 
     def mk_dirs_hierarchy(
         self,
@@ -380,14 +558,18 @@ class Tree:
         WHY: Materialize (path, is_dir) tuples under tgt_path; return first dir.
         """
         start_dir = None
+        files: List[str] = []
         with _temp_chdir(tgt_path):
+            # single pass over dirs, stub files wait until every dir exists
             for path, is_dir in dirs:
-                if os.path.exists(path):
+                if not is_dir:
+                    files.append(path)
                     continue
-                if is_dir:
+                try:
                     os.makedirs(path)
-                    start_dir = start_dir or os.path.join(tgt_path, path)
-                else:
-                    with open(path, "w", encoding="utf-8") as f:
-                        f.write(f"#{os.path.basename(path)}\n\n")
+                except FileExistsError:
+                    continue
+                start_dir = start_dir or os.path.join(tgt_path, path)
+            for path in files:
+                mk_stub_file(path)
         return start_dir
@@ -0,0 +1,79 @@
+# vad.py
+import array, math, operator
+
+# int16 rms below which a chunk counts as silence
+RMS_THRESHOLD = 300
+# silent chunks still decoded after speech, vosk needs them to end the utterance
+# the default is about one second of 20 ms chunks
+HANGOVER_CHUNKS = 50
+# speech has to be this many times louder than the background noise floor
+NOISE_FACTOR = 2.0
+# time constant in chunks for the noise floor to rise to a steady noise level,
+# it drops at once to quieter chunks, the default is about five seconds
+NOISE_ADAPT_CHUNKS = 250
+
+try:
+    _sumprod = math.sumprod
+except AttributeError:
+    def _sumprod(p, q):
+        return sum(map(operator.mul, p, q))
+
+
+def chunk_rms(data: bytes) -> float:
+    """
+    Root mean square of a chunk of native int16 PCM samples.
+    """
+    samples = array.array("h", data)
+    if not samples:
+        return 0.0
+    return math.sqrt(_sumprod(samples, samples) / len(samples))
+
+
+class EnergyGate:
+    """
+    Cheap energy based voice activity gate in front of the recognizer.
+    Chunks are only passed on while speech is ongoing or ended less than
+    hangover chunks ago, the last silent chunk is passed as pre-roll when
+    speech starts so soft word onsets are not cut.
+    A chunk counts as speech if it is above threshold and noise_factor times
+    above the noise floor, which slowly follows steady background noise such as
+    a fan or music, so that noise alone does not count as speech for long.
+    """
+
+    def __init__(self, *args, threshold: float = RMS_THRESHOLD,
+                 hangover: int = HANGOVER_CHUNKS, noise_factor: float = NOISE_FACTOR,
+                 adapt_chunks: int = NOISE_ADAPT_CHUNKS, **kwargs):
+        self.threshold = threshold
+        self.hangover = hangover
+        self.noise_factor = noise_factor
+        self.adapt_chunks = adapt_chunks
+        self.noise_floor = 0.0
+        self.silent_chunks = hangover + 1
+        self.previous = b""
+
+    def chunks(self, data: bytes) -> tuple:
+        """
+        Returns the chunks to decode for data, empty while it is silent.
+        """
+        rms = chunk_rms(data)
+        voiced = rms >= self.threshold and rms >= self.noise_floor * self.noise_factor
+        if rms < self.noise_floor:
+            self.noise_floor = rms
+        else:
+            self.noise_floor += (rms - self.noise_floor) / self.adapt_chunks
+        if voiced:
+            pre_roll = self.silent_chunks > self.hangover and self.previous
+            self.silent_chunks = 0
+            chunks = (self.previous, data) if pre_roll else (data,)
+        else:
+            self.silent_chunks += 1
+            chunks = (data,) if self.silent_chunks <= self.hangover else ()
+        self.previous = data
+        return chunks
+
+    @property
+    def voiced(self) -> bool:
+        """
+        True if the last chunk passed to chunks counted as speech.
+        """
+        return self.silent_chunks == 0
@@ -1,5 +1,5 @@
 # settings.py
-import os, re, sys, time, yaml
+import os, re, sys, time
 from datetime import datetime as dt
 
 package_name = "voice"
@@ -13,7 +13,8 @@ apis_json_dir = os.path.join(package_dir, "apis", "json_schemas")
 test_dir = os.path.join(package_dir, "test")
 test_data_dir = os.path.join(test_dir, "data")
 
-time_stamp = lambda: re.sub(r"([: .])", r"-" , str(dt.now()))
+_TS_RE = re.compile(r"[: .]")
+time_stamp = lambda: _TS_RE.sub("-", dt.now().isoformat(sep=" "))
 session_time_stamp = time_stamp()
 
 resources_dir = os.path.expanduser(f'~{os.sep}.{package_name}')
@@ -79,23 +80,49 @@ if not os.path.exists(resources_dir):
 user_settings_name = "settings.yml"
 user_settings_path = os.path.join(resources_dir, user_settings_name)
 if not os.path.exists(user_settings_path):
+    import yaml
     with open(user_settings_path, 'w') as f:
         yaml.dump({'package_name': package_name, 'port': 9007}, f)
 
+# (path, mtime_ns) -> parsed settings, kept across importlib.reload of this module
+_user_settings_cache = globals().get('_user_settings_cache', {})
+
 # Load user settings from resources YAML file
 def load_user_settings():
     """Load user settings from the YAML file."""
-    if not os.path.exists(user_settings_path):
+    try:
+        key = (user_settings_path, os.stat(user_settings_path).st_mtime_ns)
+    except OSError:
         return {}
+    if key in _user_settings_cache:
+        return dict(_user_settings_cache[key])
 
+    # yaml is only imported when the settings file actually has to be parsed
+    import yaml
+    # libyaml's C loader if available, pure Python SafeLoader otherwise
+    _Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(user_settings_path, 'r') as f:
         try:
-            return yaml.safe_load(f) or {}
+            settings = yaml.load(f, Loader=_Loader) or {}
         except yaml.YAMLError as e:
             print(f"Error loading user settings: {e}")
             return {}
+    _user_settings_cache[key] = settings
+    return dict(settings)
+
+# user settings are parsed on first access of a name this module does not
+# define itself, so importing settings does not import yaml
+_user_settings_loaded = False
 
-# we add user settings to the global namespace
-user_settings = load_user_settings()
-# Update the global namespace with user settings
-globals().update(user_settings)
+def __getattr__(name):
+    """Load user settings into the global namespace, then look up name."""
+    global user_settings, _user_settings_loaded
+    if not _user_settings_loaded and not name.startswith('__'):
+        _user_settings_loaded = True
+        user_settings = load_user_settings()
+        # Update the global namespace with user settings
+        globals().update(user_settings)
+    try:
+        return globals()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
@@ -1,11 +1,25 @@
 # File: voice/speaker.py
 
+import atexit
 import os
 import sys
-import argparse
+import functools
+import io
+import json
+import queue
+import re
+import struct
 import subprocess
-import wave
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 import logging
+import logging.handlers
+
+if TYPE_CHECKING:
+    # annotations only, argparse is imported when the cli is parsed
+    import argparse
 
 try:
     import voice.settings as sts
@@ -15,19 +29,33 @@ except ModuleNotFoundError:
 # --- Global Logger ---
 logger = logging.getLogger(__name__)
 
+_log_listener = None
+
+@atexit.register
+def _stop_log_listener() -> None:
+    if _log_listener is not None:
+        _log_listener.stop()
+
 def setup_logging(*args, log_filename: str, in_container: bool = False, **kwargs):
     """Configures the logger to write to the specified file."""
+    global _log_listener
     log_dir = "/output" if in_container else sts.resources_dir
     os.makedirs(log_dir, exist_ok=True)
     log_file_path = os.path.join(log_dir, log_filename)
 
+    if _log_listener is not None:
+        _log_listener.stop()
     if logger.hasHandlers():
         logger.handlers.clear()
 
     handler = logging.FileHandler(log_file_path, mode='w')
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # callers only enqueue records, the file is written by the listener thread
+    log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _log_listener.start()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
     logger.setLevel(logging.DEBUG)
     logger.info(f"--- Logging started for {log_filename} ---")
 
@@ -46,17 +74,87 @@ except ImportError:
     _has_simpleaudio = False
 
 
-def play_audio(file_path: str) -> None:
+_RIFF = struct.Struct("<4sI4s")
+_CHUNK = struct.Struct("<4sI")
+_FMT = struct.Struct("<HHIIHH")
+
+def parse_wav(wav_bytes: bytes) -> tuple:
+    """
+    Returns (pcm, channels, sampwidth, framerate) of pcm wav bytes, pcm is a
+    zero-copy memoryview of the data chunk. Raises ValueError for non wav input.
+    """
+    mv = memoryview(wav_bytes)
+    if len(mv) < _RIFF.size:
+        raise ValueError("wav too short")
+    riff, _, wave_id = _RIFF.unpack_from(mv, 0)
+    if riff != b"RIFF" or wave_id != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    offset, fmt = _RIFF.size, None
+    while offset + _CHUNK.size <= len(mv):
+        chunk_id, size = _CHUNK.unpack_from(mv, offset)
+        offset += _CHUNK.size
+        if chunk_id == b"fmt ":
+            fmt = _FMT.unpack_from(mv, offset)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("wav data chunk before fmt chunk")
+            _, channels, framerate, _, _, bits = fmt
+            return mv[offset:offset + size], channels, bits // 8, framerate
+        # chunks are word aligned
+        offset += size + (size & 1)
+    raise ValueError("wav has no data chunk")
+
+def _wave_object(wav_bytes: bytes):
+    """simpleaudio WaveObject from in-memory wav bytes."""
+    return sa.WaveObject(*parse_wav(wav_bytes))
+
+# last played wav file as {path: (mtime_ns, bytes)}, replays skip the disk read
+_wav_cache = {}
+
+def _load_wav(file_path: str) -> bytes:
+    mtime = os.stat(file_path).st_mtime_ns
+    cached = _wav_cache.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(file_path, "rb") as f:
+        wav_bytes = f.read()
+    _wav_cache.clear()
+    _wav_cache[file_path] = (mtime, wav_bytes)
+    return wav_bytes
+
+# decoded simpleaudio WaveObjects as {path: (mtime_ns, WaveObject)}, least recent first
+_wave_objects = OrderedDict()
+_WAVE_OBJECTS_MAX = 8
+
+def _cached_wave_object(file_path: str):
+    mtime = os.stat(file_path).st_mtime_ns
+    cached = _wave_objects.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        _wave_objects.move_to_end(file_path)
+        return cached[1]
+    with open(file_path, "rb") as f:
+        wave_obj = _wave_object(f.read())
+    _wave_objects[file_path] = (mtime, wave_obj)
+    _wave_objects.move_to_end(file_path)
+    if len(_wave_objects) > _WAVE_OBJECTS_MAX:
+        _wave_objects.popitem(last=False)
+    return wave_obj
+
+def play_audio(audio) -> None:
+    """Play a wav file path or in-memory wav bytes."""
+    in_memory = isinstance(audio, (bytes, bytearray))
     if _has_winsound:
         try:
-            _winsound.PlaySound(file_path, _winsound.SND_FILENAME)
+            # SND_MEMORY, winsound refuses SND_ASYNC for memory sounds
+            wav_bytes = bytes(audio) if in_memory else _load_wav(audio)
+            _winsound.PlaySound(wav_bytes, _winsound.SND_MEMORY)
             return
         except Exception as e:
             logger.error(f"winsound failed: {e}")
 
     if _has_simpleaudio:
         try:
-            wave_obj = sa.WaveObject.from_wave_file(file_path)
+            wave_obj = _wave_object(audio) if in_memory else _cached_wave_object(audio)
             play_obj = wave_obj.play()
             play_obj.wait_done()
             return
@@ -65,29 +163,42 @@ def play_audio(file_path: str) -> None:
 
     logger.warning("No valid audio playback method available.")
 
-try:
-    from piper.voice import PiperVoice
-except ImportError:
-    PiperVoice = None
-
-MODEL_PATH = "/app/piper_models/en_US-lessac-medium.onnx"
-CONFIG_PATH = MODEL_PATH + ".json"
+FP32_MODEL_PATH = "/app/piper_models/en_US-lessac-medium.onnx"
+# INT8 quantized model built by Dockerfile.tts, the FP32 model is the fallback
+INT8_MODEL_PATH = FP32_MODEL_PATH.replace(".onnx", ".int8.onnx")
+MODEL_PATH = INT8_MODEL_PATH if os.path.exists(INT8_MODEL_PATH) else FP32_MODEL_PATH
+CONFIG_PATH = FP32_MODEL_PATH + ".json"
 INPUT_FILE = "/app/speak.txt"
 OUTPUT_FILE = "/app/output.wav"
+# resident tts server, started once per Speaker via docker exec -i
+CONTAINER_PYTHON = "/app/venv/bin/python"
+SERVE_CMD = [CONTAINER_PYTHON, "/app/speaker.py", "--serve"]
+# seconds to wait for one tts server reply, a hung server is killed and restarted
+REQUEST_TIMEOUT = 30
 
-def container_text_to_speech(text: str) -> None:
-    """Generate speech from text by calling the piper executable."""
-    logger.info("Calling piper executable directly via subprocess...")
+def run_piper(text: str, output_file: str = OUTPUT_FILE) -> subprocess.CompletedProcess:
+    """Run the piper executable on text, raises CalledProcessError on failure."""
     command = [
         "/app/piper/piper",
         "--model", MODEL_PATH,
-        "--output_file", OUTPUT_FILE,
+        "--config", CONFIG_PATH,
+        "--output_file", output_file,
     ]
+    # Execute the command, passing the text to its standard input
+    return subprocess.run(
+        command, input=text, text=True, check=True, capture_output=True
+    )
+
+def container_text_to_speech(text: str) -> None:
+    """Generate speech from text with the cached voice or the piper executable."""
+    voice = load_voice()
+    if voice is not None:
+        synthesize_to(voice, split_sentences(text), OUTPUT_FILE)
+        logger.info("Synthesized speech with the loaded piper voice.")
+        return
+    logger.info("Calling piper executable directly via subprocess...")
     try:
-        # Execute the command, passing the text to its standard input
-        result = subprocess.run(
-            command, input=text, text=True, check=True, capture_output=True
-        )
+        result = run_piper(text)
         logger.info("Piper subprocess finished successfully.")
         logger.debug(f"Piper stdout: {result.stdout}")
     except subprocess.CalledProcessError as e:
@@ -96,7 +207,140 @@ def container_text_to_speech(text: str) -> None:
         logger.error(f"Stderr: {e.stderr}")
         sys.exit(1)
 
+@functools.lru_cache(maxsize=2)
+def _get_voice(model_path: str, config_path: str):
+    # piper only exists inside the container, the host never imports it
+    from piper.voice import PiperVoice
+    providers = ort_providers()
+    voice = PiperVoice.load(model_path, config_path=config_path,
+                            use_cuda=providers[0] == "CUDAExecutionProvider")
+    if providers[0] == "OpenVINOExecutionProvider" and hasattr(voice, "session"):
+        import onnxruntime
+        voice.session = onnxruntime.InferenceSession(
+            model_path, sess_options=onnxruntime.SessionOptions(),
+            providers=[("OpenVINOExecutionProvider", {"device_type": "CPU"}),
+                       "CPUExecutionProvider"])
+    logger.info(f"Piper voice loaded with providers: {providers}")
+    return voice
+
+def _cpu_has_vnni() -> bool:
+    """True if /proc/cpuinfo lists an AVX512 or AVX VNNI flag (int8 dot products)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_vnni" in flags or "avx_vnni" in flags
+
+@functools.lru_cache(maxsize=1)
+def ort_providers() -> tuple:
+    """
+    Onnxruntime execution providers by preference: CUDA if available, OpenVINO
+    on VNNI capable CPUs, else the default CPU provider.
+    """
+    try:
+        import onnxruntime
+        available = onnxruntime.get_available_providers()
+    except ImportError:
+        available = []
+    if "CUDAExecutionProvider" in available:
+        return ("CUDAExecutionProvider", "CPUExecutionProvider")
+    if "OpenVINOExecutionProvider" in available and _cpu_has_vnni():
+        return ("OpenVINOExecutionProvider", "CPUExecutionProvider")
+    return ("CPUExecutionProvider",)
+
+def load_voice():
+    """Load the Piper model once, None if the piper package is not installed."""
+    try:
+        return _get_voice(MODEL_PATH, CONFIG_PATH)
+    except ImportError:
+        return None
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+def split_sentences(text: str) -> list:
+    """Split text after sentence punctuation, empty parts are dropped."""
+    return [t for t in _SENTENCE_END.split(text.strip()) if t]
+
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+def wav_header(data_size: int, sample_rate: int, channels: int = 1, sampwidth: int = 2) -> bytes:
+    """44 byte pcm wav header for a known data size, piper voices are mono 16 bit."""
+    block_align = channels * sampwidth
+    return _WAV_HEADER.pack(b"RIFF", 36 + data_size, b"WAVE", b"fmt ", 16, 1, channels,
+                            sample_rate, sample_rate * block_align, block_align,
+                            8 * sampwidth, b"data", data_size)
+
+def synthesize_to(voice, texts: list, output_file: str) -> None:
+    """
+    Synthesize sentences into one wav file with a loaded voice or the piper executable.
+    With a loaded voice each sentence only streams its raw PCM frames, keeping the
+    onnx session warm across sentences, and the collected PCM is written behind a
+    header packed from its known size, so no header is patched on close.
+    """
+    if voice is None:
+        run_piper(" ".join(texts), output_file)
+        return
+    stream_raw = getattr(voice, "synthesize_stream_raw", None)
+    if stream_raw is None:
+        # piper-tts >= 1.3 has no raw stream, synthesize_wav handles sentences itself
+        import wave
+        with wave.open(output_file, "wb") as wav_file:
+            voice.synthesize_wav(" ".join(texts), wav_file)
+        return
+    pcm = b"".join(audio_bytes for sentence in texts
+                                for audio_bytes in stream_raw(sentence))
+    wav_bytes = wav_header(len(pcm), voice.config.sample_rate) + pcm
+    if isinstance(output_file, str):
+        with open(output_file, "wb") as f:
+            f.write(wav_bytes)
+    else:
+        output_file.write(wav_bytes)
+
+def synthesize_wav_bytes(voice, texts: list) -> bytes:
+    """Synthesize sentences into wav bytes, in memory when a voice is loaded."""
+    if voice is None:
+        synthesize_to(voice, texts, OUTPUT_FILE)
+        with open(OUTPUT_FILE, "rb") as f:
+            return f.read()
+    buf = io.BytesIO()
+    synthesize_to(voice, texts, buf)
+    return buf.getvalue()
+
+def serve(*args, **kwargs) -> None:
+    """
+    Resident container tts loop. Reads one json request {"texts"} per stdin line
+    (a single "text" is split into sentences) and synthesizes it with the once
+    loaded model. Replies are b"OK <size>\\n" followed by size wav bytes, or a
+    single b"ERR <message>\\n" line, so no audio file touches the bind mount.
+    """
+    setup_logging(log_filename="container_speaker_serve.log", in_container=True)
+    # stdout is the reply channel, stray prints from libraries go to stderr
+    requests, replies = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr
+    voice = load_voice()
+    logger.info(f"Serving tts requests, model loaded: {voice is not None}")
+    for line in requests:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            texts = request.get("texts") or split_sentences(request["text"])
+            wav_bytes = synthesize_wav_bytes(voice, texts)
+            reply = b"OK %d\n" % len(wav_bytes) + wav_bytes
+        except Exception as e:
+            logger.error(f"tts request failed: {e}")
+            reply = f"ERR {e}".replace("\n", " ").encode("utf-8") + b"\n"
+        replies.write(reply)
+        replies.flush()
+    logger.info("stdin closed, tts server stops.")
+
 class Speaker:
+    __slots__ = ("docker_image", "container_name", "mount_dir", "output_dir",
+                 "proc", "replies", "_container_up")
+
     def __init__(self, *args, docker_image: str = "piper_tts:latest",
                  container_name: str = "voice_runner",
                  mount_dir: str = None, **kwargs) -> None:
@@ -105,30 +349,39 @@ class Speaker:
         self.mount_dir = mount_dir or os.path.join(sts.resources_dir, "output")
         self.output_dir = f"{self.mount_dir}:/output"
         os.makedirs(self.mount_dir, exist_ok=True)
+        self.proc = None
+        # (status, payload) replies of the running server, filled by its reader thread
+        self.replies = None
+        # known running container, re-probed only after a failed request
+        self._container_up = False
 
     def ensure_container(self, *args, **kwargs) -> None:
+        if self._container_up:
+            return
         result_running = subprocess.run(
             ["docker", "ps", "-q", "-f", f"name=^{self.container_name}$"],
-            capture_output=True, text=True
+            capture_output=True
         )
         if result_running.stdout.strip():
             logger.info(f"Container '{self.container_name}' is running.")
+            self._container_up = True
             return
 
         result_all = subprocess.run(
             ["docker", "ps", "-aq", "-f", f"name=^{self.container_name}$"],
-            capture_output=True, text=True
+            capture_output=True
         )
         if result_all.stdout.strip():
             logger.info(f"Container '{self.container_name}' exists but is not running. Starting it...")
             result_start = subprocess.run(
                 ["docker", "start", self.container_name],
-                capture_output=True, text=True
+                capture_output=True
             )
             if result_start.returncode != 0:
-                logger.error(f"Error starting container: {result_start.stderr}")
+                logger.error(f"Error starting container: {result_start.stderr.decode('utf-8', 'replace')}")
                 sys.exit(1)
             logger.info(f"Container '{self.container_name}' started.")
+            self._container_up = True
             return
 
         logger.info(f"Container '{self.container_name}' not found. Creating and starting it...")
@@ -136,41 +389,116 @@ class Speaker:
             "docker", "run", "-d", "--name", self.container_name,
             "-v", self.output_dir, self.docker_image,
         ]
-        res = subprocess.run(run_cmd, capture_output=True, text=True)
+        res = subprocess.run(run_cmd, capture_output=True)
         if res.returncode != 0:
-            logger.error(f"Error creating container: {res.stderr}")
+            logger.error(f"Error creating container: {res.stderr.decode('utf-8', 'replace')}")
             sys.exit(1)
         logger.info(f"Container '{self.container_name}' started.")
+        self._container_up = True
+
+    def start_server(self, *args, **kwargs) -> None:
+        """Start the resident tts server inside the container (see serve)."""
+        self.ensure_container()
+        exec_cmd = ["docker", "exec", "-i", self.container_name, *SERVE_CMD]
+        logger.info(f"Starting tts server -> {' '.join(exec_cmd)}")
+        self.proc = subprocess.Popen(
+            exec_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # replies are read on a thread, so _request can wait for them with a timeout
+        self.replies = queue.SimpleQueue()
+        threading.Thread(target=self._read_replies, args=(self.proc.stdout, self.replies),
+                         daemon=True).start()
+
+    @staticmethod
+    def _read_replies(stdout, replies: queue.SimpleQueue) -> None:
+        """
+        Reader thread of one tts server, puts each reply as (status, payload) and
+        a final empty status once the pipe closes or a reply is truncated.
+        """
+        try:
+            for line in iter(stdout.readline, b""):
+                status, _, payload = line.strip().partition(b" ")
+                if status == b"OK":
+                    size = int(payload)
+                    payload = stdout.read(size)
+                    if len(payload) != size:
+                        break
+                replies.put((status, payload))
+        except (OSError, ValueError) as e:
+            logger.error(f"tts server reply failed: {e}")
+        replies.put((b"", b"tts server pipe closed"))
+
+    def close(self, *args, **kwargs) -> None:
+        """Stop the tts server, closing stdin ends its request loop."""
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+        self.proc = None
+
+    def _request(self, text: str, *args, **kwargs) -> tuple:
+        """
+        Send one utterance to the tts server, returns (status, payload) where
+        payload is the wav bytes for b"OK" and the error message otherwise.
+        A dead server, or one without a reply within REQUEST_TIMEOUT, yields an
+        empty status.
+        """
+        if self.proc is None or self.proc.poll() is not None:
+            self.start_server()
+        request = json.dumps({"texts": split_sentences(text)}).encode("utf-8")
+        self.proc.stdin.write(request + b"\n")
+        self.proc.stdin.flush()
+        try:
+            return self.replies.get(timeout=REQUEST_TIMEOUT)
+        except queue.Empty:
+            logger.error(f"tts server did not reply within {REQUEST_TIMEOUT}s, killing it.")
+            self.proc.kill()
+            return b"", b"timeout"
+
+    def synthesize(self, text: str, *args, **kwargs) -> bytes:
+        """Wav bytes for text from the tts server, exits if the server fails."""
+        status, payload = b"", b""
+        # a dead server (container restarted, pipe closed) is restarted once
+        for attempt in range(2):
+            try:
+                status, payload = self._request(text)
+            except (OSError, ValueError) as e:
+                logger.error(f"tts server pipe failed: {e}")
+            if status:
+                break
+            self.close()
+            self._container_up = False
+        if status != b"OK":
+            logger.error(f"tts server request failed: {payload.decode('utf-8', 'replace')}")
+            sys.exit(1)
+        return payload
 
     def speak(self, text: str, *args, **kwargs) -> None:
         if os.environ.get("IN_CONTAINER"):
             container_text_to_speech(text)
         else:
-            self.ensure_container()
-            exec_cmd = ["docker", "exec", self.container_name, "/app/run_tts.sh", text]
-            logger.info(f"Running command -> {' '.join(exec_cmd)}")
-            try:
-                result = subprocess.run(
-                    exec_cmd, capture_output=True, text=True, timeout=30
-                )
-            except Exception as e:
-                logger.error(f"Subprocess execution failed: {e}")
-                sys.exit(1)
+            wav_bytes = self.synthesize(text)
+            logger.info(f"Playing {len(wav_bytes)} wav bytes...")
+            play_audio(wav_bytes)
 
-            logger.debug(f"Return Code: {result.returncode}")
-            logger.debug(f"Stdout: '{result.stdout.strip()}'")
-            logger.debug(f"Stderr: '{result.stderr.strip()}'")
-            if result.returncode != 0:
-                logger.error("Docker exec command failed.")
-                sys.exit(1)
-
-            output_file = os.path.join(self.mount_dir, "output.wav")
-            if not os.path.exists(output_file):
-                logger.error(f"output.wav was not generated in '{self.mount_dir}'")
-                sys.exit(1)
-            
-            logger.info("Playing output.wav...")
-            play_audio(output_file)
+    def speak_paragraphs(self, paragraphs: list, *args, **kwargs) -> None:
+        """
+        Speak paragraphs in order, the container synthesizes the next paragraph
+        while the current one plays on the host.
+        """
+        # one worker, the server pipe takes one request at a time
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(self.synthesize, paragraphs[0])
+            for paragraph in paragraphs[1:] + [None]:
+                wav_bytes = pending.result()
+                if paragraph is not None:
+                    pending = pool.submit(self.synthesize, paragraph)
+                logger.info(f"Playing {len(wav_bytes)} wav bytes...")
+                play_audio(wav_bytes)
 
 def container_exec(*args, **kwargs) -> None:
     setup_logging(log_filename="container_speaker.log", in_container=True)
@@ -198,20 +526,39 @@ def local_exec(*args, text: str = None, file: str = None, **kwargs):
         sys.exit(1)
     
     speaker = Speaker(*args, **kwargs)
-    speaker.speak(input_text, *args, **kwargs)
+    paragraphs = [p for p in _PARAGRAPH_BREAK.split(input_text) if p.strip()]
+    try:
+        if len(paragraphs) > 1:
+            speaker.speak_paragraphs(paragraphs, *args, **kwargs)
+        else:
+            speaker.speak(input_text, *args, **kwargs)
+    finally:
+        # ends the docker exec child of the tts server
+        speaker.close()
 
-def main(*args, **kwargs) -> None:
+def main(*args, serve_tts: bool = False, **kwargs) -> None:
     if os.environ.get("IN_CONTAINER"):
-        container_exec(*args, **kwargs)
+        if serve_tts:
+            serve(*args, **kwargs)
+        else:
+            container_exec(*args, **kwargs)
     else:
         local_exec(*args, **kwargs)
 
-def get_kwargs(*args, **kwargs) -> argparse.Namespace:
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> "argparse.ArgumentParser":
+    import argparse
     parser = argparse.ArgumentParser()
     group = parser.add_mutually_exclusive_group(required=False)
     group.add_argument("-t", "--text", help="Direct input text for TTS.")
     group.add_argument("-f", "--file", help="Path to text file for TTS.")
-    args = parser.parse_args()
+    parser.add_argument("--serve", action="store_true",
+                        help="Run the resident TTS server on stdin/stdout (container only).")
+    return parser
+
+def get_kwargs(*args, argv: list = None, **kwargs) -> "argparse.Namespace":
+    """Parsed cli args, argv defaults to sys.argv[1:]."""
+    args = _build_parser().parse_args(argv)
     if not args.text and not args.file:
         if os.environ.get("IN_CONTAINER"):
             args.file = INPUT_FILE
@@ -221,4 +568,4 @@ def get_kwargs(*args, **kwargs) -> argparse.Namespace:
 
 if __name__ == "__main__":
     args = get_kwargs()
-    main(text=args.text, file=args.file)
\ No newline at end of file
+    main(text=args.text, file=args.file, serve_tts=args.serve)
\ No newline at end of file
@@ -0,0 +1,182 @@
+# test_collections.py
+# C:\Users\lars\python_venvs\packages\voice_audio\voice\test\test_ut\test_collections.py
+
+import random
+import re
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from colorama import Fore, Style
+
+from voice.helpers.collections import (
+                                        _literal_prefix, color_expert, get_sec_entry,
+                                        hide_tags, restore_existing_linebreaks,
+)
+import voice.settings as sts
+
+
+def _restore_existing_linebreaks_passes(text):
+    """
+    the former sequential re.sub passes, reference for restore_existing_linebreaks
+    """
+    text = re.sub(r'(<lb>\s*)(\d+\.\s)', r'\n\2', text)
+    text = re.sub(r'(<lb>\s*)(-\s*)', r'\n\2', text)
+    text = re.sub(r'(<lb>\s*)(<code_block_\d+>\s*)(<lb>\s*)', r'\n\2\n', text)
+    text = re.sub(r'\n(\n\d+\.\s|\n-\s|\n<code_block_\d+\s)', r'\1', text)
+    text = re.sub(r'\n<lb>\s*', r'\n', text)
+    text = re.sub(r'\s*<lb>\s*', r' ', text)
+    return text
+
+
+class Test_RestoreExistingLinebreaks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verbose = 0
+        cls.parts = [
+                        'word', 'two words', 'x.', '1. item', '12. item', '- item',
+                        '-item', '<code_block_1> <lb> word',
+        ]
+        cls.separators = [' <lb> ', '\n<lb> ', '\n\n<lb> ', ' <lb>\n', ' ', '\n']
+
+    def test_examples(self):
+        cases = {
+            "para one\n\n<lb>para two": "para one\n\npara two",
+            "a <lb> b": "a b",
+            "a\n<lb> b": "a\nb",
+            "a <lb> 1. b": "a \n1. b",
+            "a\n<lb> 1. b": "a\n1. b",
+            "a <lb> - b": "a \n- b",
+            "a <lb> <code_block_1> <lb> b": "a \n<code_block_1> \nb",
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(restore_existing_linebreaks(text), expected)
+                self.assertEqual(_restore_existing_linebreaks_passes(text), expected)
+
+    def test_matches_former_passes(self):
+        # single <lb> markers between text, the form group_text produces for text
+        # without empty lines
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = ''.join(
+                            rng.choice(self.parts) + rng.choice(self.separators)
+                            for _ in range(rng.randint(1, 8))
+            )
+            with self.subTest(text=text):
+                self.assertEqual(
+                                    restore_existing_linebreaks(text),
+                                    _restore_existing_linebreaks_passes(text)
+                )
+
+    def test_marker_runs_collapse(self):
+        # consecutive markers (empty lines) become one space instead of one per marker
+        self.assertEqual(restore_existing_linebreaks("a <lb>  <lb> b"), "a b")
+        self.assertEqual(restore_existing_linebreaks("a <lb>  <lb> 1. b"), "a \n1. b")
+
+
+class Test_GetSecEntry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verbose = 0
+        cls.d = {
+                    'a': {'m': None, 'x': {'m': 5}},
+                    'b': {'c': {'m': 'deep'}, 'm': 'flat'},
+                    'top': 1,
+        }
+
+    def test_key(self):
+        self.assertEqual(get_sec_entry(self.d, 'c'), 'b')
+        self.assertEqual(get_sec_entry(self.d, 'top', current_key='root'), 'root')
+        self.assertIsNone(get_sec_entry(self.d, 'missing'))
+
+    def test_value(self):
+        # a None value ends the search in its dict, the parent dict continues
+        self.assertEqual(get_sec_entry(self.d, 'm', ret='value'), 'deep')
+        self.assertEqual(get_sec_entry(self.d['b'], 'm', ret='value'), 'deep')
+        self.assertIsNone(get_sec_entry(self.d['a'], 'm', ret='value'))
+
+    def test_mutation_is_seen(self):
+        d = {'a': {'b': 1}}
+        self.assertEqual(get_sec_entry(d, 'b', ret='value'), 1)
+        d['a']['b'] = 2
+        self.assertEqual(get_sec_entry(d, 'b', ret='value'), 2)
+
+    def test_not_a_dict(self):
+        self.assertIsNone(get_sec_entry(['m'], 'm'))
+
+
+class Test_ColorExpert(unittest.TestCase):
+    def test_color(self):
+        experts = {'alice': SimpleNamespace(color_code=Fore.GREEN), 'Bob': SimpleNamespace()}
+        with mock.patch.object(sts, "experts", experts, create=True):
+            self.assertIn(Fore.GREEN, color_expert('Alice', 'user'))
+            # keys are looked up with the lowercased name, as stored
+            self.assertIn(Fore.RED, color_expert('Bob', 'user'))
+            self.assertIn(Fore.RED, color_expert('carol', 'user'))
+            experts['carol'] = SimpleNamespace(color_code=Fore.BLUE)
+            self.assertIn(Fore.BLUE, color_expert('carol', 'user'))
+
+    @unittest.skipIf(hasattr(sts, "experts"), "settings define experts")
+    def test_no_experts(self):
+        self.assertIn(Fore.RED, color_expert('alice', 'user'))
+
+
+def _hide_tags_passes(text, verbose=0):
+    """
+    the former hide_tags loop, reference for hide_tags
+    """
+    for start, end in sts.tags.values():
+        if verbose == 0:
+            start, replacement = r"\s*" + start, r''
+        elif verbose <= 1:
+            replacement = f"{Fore.CYAN}{start}...{end}{Style.RESET_ALL}"
+        else:
+            replacement = f'\n{Fore.CYAN}\\1{Style.RESET_ALL}\n'
+        text = re.sub(fr'({start}.*?{end})', replacement, text, flags=re.DOTALL)
+    return '\n' + text
+
+
+class Test_HideTags(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verbose = 0
+        cls.tags = {
+                    'pg_info': ('<pg_info>', '</pg_info>'),
+                    'alt': ('abc|def', 'xyz'),
+                    'opt': ('<o?t>', '</t>'),
+        }
+        cls.texts = [
+                        'keep <pg_info>drop\nthis</pg_info> keep',
+                        'only def 1 xyz here',
+                        'abc xyz and def xyz',
+                        'a <t>x</t> and <ot>y</t>',
+                        'no tags at all',
+        ]
+
+    def test_literal_prefix(self):
+        self.assertEqual(_literal_prefix('<pg_info>'), '<pg_info>')
+        self.assertEqual(_literal_prefix('<o?t>'), '<')
+        self.assertEqual(_literal_prefix('abc|def'), '')
+        self.assertEqual(_literal_prefix('(a|b)c'), '')
+        self.assertEqual(_literal_prefix('a[|]c'), 'a')
+
+    def test_matches_former_loop(self):
+        with mock.patch.object(sts, "tags", self.tags, create=True):
+            for text in self.texts:
+                for verbose in (0, 1, 2):
+                    with self.subTest(text=text, verbose=verbose):
+                        self.assertEqual(
+                                            hide_tags(text, verbose=verbose),
+                                            _hide_tags_passes(text, verbose=verbose)
+                        )
+
+    def test_tag_changes_are_seen(self):
+        with mock.patch.object(sts, "tags", {}, create=True):
+            self.assertEqual(hide_tags('a <b>c</b>'), '\na <b>c</b>')
+            sts.tags['b'] = ('<b>', '</b>')
+            self.assertEqual(hide_tags('a <b>c</b>'), '\na')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# test_tones.py
+# C:\Users\lars\python_venvs\packages\voice_audio\voice\test\test_ut\test_tones.py
+
+import io
+import os
+import tempfile
+import unittest
+import wave
+
+from voice.helpers.tones import RATE, SEQUENCES, tone_files, tone_wav
+
+
+class Test_Tones(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verbose = 0
+
+    def test_tone_wav(self):
+        with wave.open(io.BytesIO(tone_wav((600, 1000), duration_ms=100))) as wf:
+            self.assertEqual(wf.getnchannels(), 1)
+            self.assertEqual(wf.getsampwidth(), 2)
+            self.assertEqual(wf.getframerate(), RATE)
+            # one duration_ms block per frequency
+            self.assertEqual(wf.getnframes(), 2 * (RATE * 100 // 1000))
+
+    def test_tone_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            target_dir = os.path.join(tmp, "tones")
+            paths = tone_files(target_dir)
+            self.assertEqual(set(paths), set(SEQUENCES))
+            for status, path in paths.items():
+                with wave.open(path) as wf:
+                    self.assertEqual(
+                                        wf.getnframes(),
+                                        len(SEQUENCES[status]) * (RATE * 150 // 1000)
+                    )
+
+    def test_tone_files_are_written_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = tone_files(tmp)["START"]
+            with open(path, "wb") as f:
+                f.write(b"kept")
+            self.assertEqual(tone_files(tmp)["START"], path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"kept")
+
+
+if __name__ == "__main__":
+    unittest.main()
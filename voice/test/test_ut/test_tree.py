@@ -0,0 +1,56 @@
+# test_tree.py
+# C:\Users\lars\python_venvs\packages\voice_audio\voice\test\test_ut\test_tree.py
+
+import os
+import tempfile
+import unittest
+
+from voice.helpers.tree import Tree
+
+
+class Test_Tree(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verbose = 0
+        cls.tree = Tree()
+        # pasted trees may carry a common indent, which parse_tree removes
+        pad = "  "
+        cls.tree_text = "\n".join([
+            f"{pad}|--▼ pkg",
+            f"{pad}    |- setup.py",
+            f"{pad}    |--▼ src",
+            f"{pad}        |- main.py",
+            f"{pad}    |--▼ docs",
+            f"{pad}        |- index.md",
+            "",
+        ])
+        cls.expected = [
+            ("pkg", True),
+            (os.path.join("pkg", "setup.py"), False),
+            (os.path.join("pkg", "src"), True),
+            (os.path.join("pkg", "src", "main.py"), False),
+            (os.path.join("pkg", "docs"), True),
+            (os.path.join("pkg", "docs", "index.md"), False),
+        ]
+
+    def test_parse_tree(self):
+        parsed = self.tree.parse_tree(self.tree_text)
+        # a generator, paths are produced on iteration
+        self.assertFalse(isinstance(parsed, list))
+        self.assertEqual(list(parsed), self.expected)
+
+    def test_mk_dirs_hierarchy(self):
+        with tempfile.TemporaryDirectory() as tgt_path:
+            start_dir = self.tree.mk_dirs_hierarchy(
+                                                    self.tree.parse_tree(self.tree_text),
+                                                    tgt_path,
+            )
+            self.assertEqual(start_dir, os.path.join(tgt_path, "pkg"))
+            for path, is_dir in self.expected:
+                full_path = os.path.join(tgt_path, path)
+                check = os.path.isdir if is_dir else os.path.isfile
+                self.assertTrue(check(full_path), full_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
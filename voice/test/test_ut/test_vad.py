@@ -0,0 +1,73 @@
+# test_vad.py
+# C:\Users\lars\python_venvs\packages\voice_audio\voice\test\test_ut\test_vad.py
+
+import array
+import math
+import unittest
+
+from voice.helpers.vad import EnergyGate, chunk_rms
+
+
+def _chunk(amplitude: float, n: int = 320) -> bytes:
+    """
+    sine chunk of native int16 samples with the given peak amplitude
+    """
+    return array.array("h", (int(amplitude * math.sin(i / 3)) for i in range(n))).tobytes()
+
+
+class Test_EnergyGate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verbose = 0
+        cls.silence = _chunk(0)
+        cls.speech = _chunk(4000)
+
+    def test_chunk_rms(self):
+        self.assertEqual(chunk_rms(b""), 0.0)
+        self.assertEqual(chunk_rms(self.silence), 0.0)
+        self.assertAlmostEqual(chunk_rms(_chunk(1000, n=32000)), 1000 / math.sqrt(2), delta=5)
+
+    def test_silence_is_skipped(self):
+        gate = EnergyGate(hangover=2)
+        self.assertEqual(gate.chunks(self.silence), ())
+        self.assertFalse(gate.voiced)
+
+    def test_pre_roll_and_hangover(self):
+        gate = EnergyGate(hangover=2)
+        gate.chunks(self.silence)
+        # the last silent chunk is passed as pre-roll when speech starts
+        self.assertEqual(gate.chunks(self.speech), (self.silence, self.speech))
+        self.assertTrue(gate.voiced)
+        self.assertEqual(gate.chunks(self.speech), (self.speech,))
+        # silence is passed on for hangover chunks after speech, then dropped
+        self.assertEqual(gate.chunks(self.silence), (self.silence,))
+        self.assertEqual(gate.chunks(self.silence), (self.silence,))
+        self.assertFalse(gate.voiced)
+        self.assertEqual(gate.chunks(self.silence), ())
+
+    def test_steady_noise_stops_counting_as_speech(self):
+        gate, noise = EnergyGate(hangover=2, adapt_chunks=50), _chunk(1000)
+        voiced = []
+        for _ in range(500):
+            gate.chunks(noise)
+            voiced.append(gate.voiced)
+        # a fan or music above the fixed threshold is speech only until the
+        # noise floor has caught up, so the silence timeout can still fire
+        self.assertTrue(voiced[0])
+        self.assertFalse(any(voiced[-100:]))
+        # speech well above the noise is still detected
+        gate.chunks(self.speech)
+        self.assertTrue(gate.voiced)
+
+    def test_noise_floor_drops_at_once(self):
+        gate = EnergyGate(hangover=2, adapt_chunks=10)
+        for _ in range(100):
+            gate.chunks(_chunk(3000))
+        gate.chunks(self.silence)
+        self.assertEqual(gate.noise_floor, 0.0)
+        gate.chunks(_chunk(1000))
+        self.assertTrue(gate.voiced)
+
+
+if __name__ == "__main__":
+    unittest.main()
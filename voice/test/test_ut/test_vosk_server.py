@@ -0,0 +1,72 @@
+# test_vosk_server.py
+# C:\Users\lars\python_venvs\packages\voice_audio\voice\test\test_ut\test_vosk_server.py
+
+import json
+import threading
+import unittest
+from types import SimpleNamespace
+
+# the server needs flask and the audio stack (pyaudio, vosk) of voice_class
+try:
+    from voice import vosk_server
+    _has_server_deps = True
+except ImportError:
+    vosk_server = None
+    _has_server_deps = False
+
+
+def _user_msgs(*contents) -> list:
+    return [{"role": "user", "content": c, "msg_timestamp": i} for i, c in enumerate(contents)]
+
+
+@unittest.skipUnless(_has_server_deps, "flask, pyaudio or vosk not installed")
+class Test_VoskServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verbose = 0
+
+    def setUp(self):
+        # VoskServer without __init__, so no App, audio device or api thread is started
+        self.server = vosk_server.VoskServer.__new__(vosk_server.VoskServer)
+        self.messages = {"user": _user_msgs("old one", "old two"), "assistant": []}
+        self.listener = SimpleNamespace(recording=False, recording_thread=None, running=True)
+        self.server.app = SimpleNamespace(
+                                            conversation=SimpleNamespace(messages=self.messages),
+                                            listener=self.listener,
+        )
+        self.server._stop_event = threading.Event()
+        # as initialized by VoskServer.__init__, the end of the loaded history
+        self.server.listen_start_idx = len(self.messages["user"])
+        vosk_server.app.config["VOSK_SERVER"] = self.server
+        self.client = vosk_server.app.test_client()
+
+    def test_session_messages_are_the_tail(self):
+        self.assertEqual(self.server.get_session_user_messages(), [])
+        self.messages["user"].extend(_user_msgs("new one", "new two"))
+        contents = [m["content"] for m in self.server.get_session_user_messages()]
+        self.assertEqual(contents, ["new one", "new two"])
+
+    def test_result(self):
+        self.assertEqual(json.loads(self.client.get("/result").data), {"result": []})
+        self.messages["user"].extend(_user_msgs("new one"))
+        result = json.loads(self.client.get("/result").data)["result"]
+        self.assertEqual([m["content"] for m in result], ["new one"])
+
+    def test_result_while_recording(self):
+        self.listener.recording = True
+        self.assertEqual(json.loads(self.client.get("/result").data), {"result": None})
+
+    def test_bye_stops_the_server(self):
+        self.server._handle_user_message({"role": "user", "content": "hello"})
+        self.assertTrue(self.server.running)
+        self.server._handle_user_message({"role": "user", "content": " /bye "})
+        self.assertFalse(self.server.running)
+        self.assertFalse(self.listener.running)
+
+    def test_stop_endpoint(self):
+        self.client.post("/stop")
+        self.assertFalse(self.server.running)
+
+
+if __name__ == "__main__":
+    unittest.main()
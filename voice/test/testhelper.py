@@ -18,7 +18,7 @@ temp_pw:        sets the environment variables DATASAFEKEY and DATAKEY to empty
 """
 
 
-import json, os, shutil, sys, time, yaml
+import json, os, shutil, sys, time
 
 
 from contextlib import contextmanager
@@ -37,6 +37,7 @@ def temp_secret(j, *args, secretsFilePath: str, entryName: str, **kwargs) -> Non
             {entryName: secretToWrite}
     """
     fType = os.path.splitext(secretsFilePath)[-1]
+    import yaml
     try:
         secrets = j.secrets.get(entryName)
         with open(secretsFilePath, "w") as f:
@@ -46,8 +47,7 @@ def temp_secret(j, *args, secretsFilePath: str, entryName: str, **kwargs) -> Non
                 yaml.dump(secrets, f)
             else:
                 raise Exception(f"Invalid file extension: {fType}, use [.json, sts.fext]")
-        while not os.path.exists(secretsFilePath):
-            continue
+        # the file is complete and visible once the with block has closed it
         yield
     except Exception as e:
         print(f"oamailer.secrets_loader Exception: {e}")
@@ -120,6 +120,27 @@ def temp_safe_rename(*args, safeName: str, prefix: str = "#", **kwargs) -> None:
             time.sleep(0.1)
 
 
+def copy_fixture(sourcePath: str, targetPath: str) -> str:
+    """
+    copies a test fixture via os.copy_file_range, which lets the kernel share blocks
+    (reflink) on filesystems supporting it, falls back to shutil.copyfile otherwise
+    NOTE: no hardlinks, tests change their temp files and would change the fixture
+    """
+    try:
+        with open(sourcePath, "rb") as src, open(targetPath, "wb") as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        if remaining > 0:
+            raise OSError(f"short copy of {sourcePath}")
+    except (AttributeError, OSError):
+        shutil.copyfile(sourcePath, targetPath)
+    return targetPath
+
+
 def test_setup(*args, temp_pass:str=None, **kwargs):
     """
     A decorator for setting up a test environment with a temporary file, a specific
@@ -184,7 +205,7 @@ def temp_test_file(temp_dir_name: str, *args, temp_file: str, **kwargs) -> None:
         tempPath = os.path.join(tempDir, temp_file)
         if not os.path.isdir(tempDir):
             os.makedirs(tempDir)
-        shutil.copyfile(sourcePath, tempPath)
+        copy_fixture(sourcePath, tempPath)
         yield tempPath
     finally:
         if os.path.exists(tempDir):
@@ -225,8 +246,7 @@ def mk_test_dir(temp_dir_name, *args, **kwargs):
 def copy_test_data(temp_dir_name, testFileName, *args, targetName=None, **kwargs):
     print(testFileName)
     target = os.path.join(temp_dir_name, testFileName if targetName is None else targetName)
-    shutil.copyfile(os.path.join(sts.test_data_dir, testFileName), target)
-    return target
+    return copy_fixture(os.path.join(sts.test_data_dir, testFileName), target)
 
 
 # helper functions for unittest setup and teardown
@@ -238,6 +258,7 @@ def mk_test_file(tempDataDir, fileName, testDataStr=None, *args, **kwargs):
     testDataStr = sts.cryptonizeDataStr if testDataStr is None else testDataStr
     if testFilePath.endswith(".yml"):
         if not os.path.isfile(testFilePath):
+            import yaml
             with open(testFilePath, "w") as f:
                 f.write(yaml.dump(sts.testDataDict))
     elif testFilePath.endswith(".json"):
@@ -1,4 +1,7 @@
+import json
 import os
+import queue
+import re
 import sys
 import threading
 import wave
@@ -13,6 +16,9 @@ from tqdm import tqdm
 import time
 
 import voice.settings as sts
+from voice.helpers.vad import EnergyGate
+from voice.helpers.tones import tone_files
+from voice.helpers.realtime import boost_thread_priority
 
 # After the existing imports at the top of the file
 try:
@@ -28,8 +34,11 @@ except ImportError:
 MODEL_PATH = "{sts.resources_dir}/vosk_model/vosk-model-en-us-0.22"
 TIMEOUT_SECONDS = 20
 PROGRESS_BAR_SECONDS = 25
-CHUNK = 1024
+# 20 ms chunks, vosk can end an utterance at any chunk boundary
+CHUNK = 320
 RATE = 16000
+# about one second of audio in chunks, for the capture queue and the vad hangover
+CHUNKS_PER_SECOND = RATE // CHUNK
 CHANNELS = 1
 FORMAT = pyaudio.paInt16
 
@@ -40,65 +49,78 @@ is_recording = False
 recording_thread = None
 last_speech_time = time.time()
 running = True
-stop_commands = {'stop recording', 'stop listening', 'end recording', 'end listening', 
+stop_commands = frozenset({'stop recording', 'stop listening', 'end recording', 'end listening', 
                 'okay thanks', 'okay bye', 'thank you bye', 'thanks bye', 'alright thanks', 
-                'alright bye', 'forget it bye', 'thats all bye'}
+                'alright bye', 'forget it bye', 'thats all bye'})
+stop_commands_re = re.compile("|".join(map(re.escape, stop_commands)))
 
 # ---------------------------------------
 # Suppress Vosk logs
 # ---------------------------------------
 SetLogLevel(-1)
 
-# Check if model path exists
-if not os.path.exists(MODEL_PATH):
-    raise FileNotFoundError(    f"Vosk model not found. "
-                                f"Please place it in '{sts.resources_dir}/vosk_model/vosk-model-en-us-0.22'.")
-
-model_loaded = False
+model_loaded = threading.Event()
 model = None
+# created by init(), importing this module has no side effects
+tts_engine = None
+audio = None
+root = None
+recording_label = None
+recognizer = None
+sample_width = None
 
 # ---------------------------------------
 # Model Loading
 # ---------------------------------------
 def model_loader():
-    global model, model_loaded
+    global model
     model = Model(MODEL_PATH)
-    model_loaded = True
-
-loader_thread = threading.Thread(target=model_loader)
-loader_thread.start()
-
-# Initialize TTS Engine
-tts_engine = pyttsx3.init()
+    model_loaded.set()
 
 def speak(text: str):
     tts_engine.say(text)
     tts_engine.runAndWait()
 
-speak("Loading Vosk model. This will take about 30 seconds.")
-
-# Show a progress bar for a fixed 30 seconds
-for i in tqdm(range(PROGRESS_BAR_SECONDS), desc="Initializing, ...", ncols=70, colour="cyan"):
-    time.sleep(1)
-loader_thread.join()
-
-speak("Model loaded successfully! Press zero on the num block, and I will listen.")
-
-
-# ---------------------------------------
-# Audio and GUI Setup
-# ---------------------------------------
-audio = pyaudio.PyAudio()
-
-root = tk.Tk()
-root.title("Recording")
-root.geometry("200x100")
-root.withdraw()
+def init():
+    """
+    Loads the Vosk model and sets up tts, audio and the hidden recording window.
+    """
+    global tts_engine, audio, root, recording_label, recognizer, sample_width
+    # Check if model path exists
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(    f"Vosk model not found. "
+                                    f"Please place it in '{sts.resources_dir}/vosk_model/vosk-model-en-us-0.22'.")
+    loader_thread = threading.Thread(target=model_loader)
+    loader_thread.start()
+
+    # Initialize TTS Engine
+    tts_engine = pyttsx3.init()
+    speak("Loading Vosk model. This will take about 30 seconds.")
+
+    # Show a progress bar until the model is loaded, at most PROGRESS_BAR_SECONDS
+    for i in tqdm(range(PROGRESS_BAR_SECONDS), desc="Initializing, ...", ncols=70, colour="cyan"):
+        if model_loaded.is_set():
+            break
+        time.sleep(1)
+    loader_thread.join()
+
+    speak("Model loaded successfully! Press zero on the num block, and I will listen.")
+
+    # ---------------------------------------
+    # Audio and GUI Setup
+    # ---------------------------------------
+    audio = pyaudio.PyAudio()
+    sample_width = audio.get_sample_size(FORMAT)
+
+    root = tk.Tk()
+    root.title("Recording")
+    root.geometry("200x100")
+    root.withdraw()
 
-recording_label = Label(root, text="● Recording", font=("Helvetica", 24), fg="red")
-recording_label.pack(expand=True)
+    recording_label = Label(root, text="● Recording", font=("Helvetica", 24), fg="red")
+    recording_label.pack(expand=True)
 
-recognizer = KaldiRecognizer(model, RATE)
+    recognizer = KaldiRecognizer(model, RATE)
 
 # ---------------------------------------
 # Functions
@@ -129,27 +151,58 @@ def record_audio():
     # If we're not running or not recording, return immediately
     if not running or not is_recording:
         return
+    # this thread decodes the audio, it should not wait behind the gui
+    boost_thread_priority()
+    audio_q = queue.Queue(maxsize=CHUNKS_PER_SECOND)
+
+    def on_audio(in_data, frame_count, time_info, status):
+        # runs on the portaudio thread, chunks are dropped if recognition lags
+        try:
+            audio_q.put_nowait(in_data)
+        except queue.Full:
+            pass
+        return None, pyaudio.paContinue
+
     try:
         stream = audio.open(format=FORMAT, channels=CHANNELS, rate=RATE,
-                            input=True, frames_per_buffer=CHUNK)
+                            input=True, frames_per_buffer=CHUNK,
+                            stream_callback=on_audio)
         # In the record_audio() function, after opening the stream, add:
         last_speech_time = time.time()
-        frames = []
+        # recorded chunks are streamed to disk, the header is patched once on close
+        wf = wave.open("output.wav", "wb")
+        wf.setnchannels(CHANNELS)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(RATE)
         speak("What now!")
+        # silence is not decoded, only the tail vosk needs to end an utterance
+        gate = EnergyGate(hangover=CHUNKS_PER_SECOND)
+        # per chunk calls bound once
+        get_chunk, gate_chunks, accept = audio_q.get, gate.chunks, recognizer.AcceptWaveform
         # In toggle_recording(), right after `print(f"{Fore.GREEN}Recording started!{Style.RESET_ALL}")`:
         while running and is_recording:
-            data = stream.read(CHUNK)
-            if recognizer.AcceptWaveform(data):
+            try:
+                data = get_chunk(timeout=1)
+            except queue.Empty:
+                data = None
+            accepted = False
+            for chunk in (gate_chunks(data) if data is not None else ()):
+                accepted = accept(chunk) or accepted
+            # the silence timeout follows speech above the noise floor, not vosk's commits
+            if data is not None and gate.voiced:
+                last_speech_time = time.time()
+            if accepted:
                 result = recognizer.Result()
-                recognized_text = eval(result)["text"].strip()
+                recognized_text = json.loads(result).get("text", "").strip()
                 if recognized_text and recognized_text != 'the':
                     print(f"{Fore.CYAN}Recognized Text: {recognized_text}{Style.RESET_ALL}")
                     last_speech_time = time.time()
-                    if any([cmd in recognized_text for cmd in stop_commands]):
+                    if recognized_text in stop_commands or stop_commands_re.search(recognized_text):
                         print(f"{Fore.YELLOW}Stopping recording.{Style.RESET_ALL}")
                         is_recording = False
                         break
-            frames.append(data)
+            if data is not None:
+                wf.writeframesraw(data)
             # Timeout after TIMEOUT_SECONDS of silence
             if time.time() - last_speech_time > TIMEOUT_SECONDS:
                 print(f"{Fore.YELLOW}Listening Timeout: Stopping recording.{Style.RESET_ALL}")
@@ -158,23 +211,17 @@ def record_audio():
 
         stream.stop_stream()
         stream.close()
+        wf.close()
         close_recording_symbol()
         # Still in toggle_recording(), right after `print(f"{Fore.RED}Recording stopped!{Style.RESET_ALL}")`:
         play_sound("STOP")
 
         # Flush final result
         final_res = recognizer.FinalResult()
-        final_text = eval(final_res).get("text", "").strip()
+        final_text = json.loads(final_res).get("text", "").strip()
         if final_text and final_text != 'the':
             print(f"{Fore.CYAN}Recognized Text: {final_text}{Style.RESET_ALL}")
 
-        # Save recording
-        with wave.open("output.wav", "wb") as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(audio.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
-
     except OSError as e:
         # If we're shutting down (running=False), just suppress the error silently
         if running:
@@ -193,6 +240,7 @@ def start_listener():
 
 def main():
     global running, is_recording
+    init()
     print("Press F20 to toggle recording...")
     listener_thread = threading.Thread(target=start_listener)
     listener_thread.daemon = True
@@ -215,6 +263,8 @@ def main():
 
 
 # After other functions and before main(), define play_sound
+tones = {}
+
 def play_sound(status: str):
     """
     Plays a short acoustic signal based on the given status.
@@ -222,14 +272,11 @@ def play_sound(status: str):
         status: (str) One of ["LOADED", "START", "STOP"].
     """
     if SOUND_AVAILABLE:
-        if status == "LOADED":
-            winsound.Beep(800, 150)   # 800 Hz for 150ms
-        elif status == "START":
-            winsound.Beep(600, 150)   # Lower pitch
-            winsound.Beep(1000, 150)  # Higher pitch
-        elif status == "STOP":
-            winsound.Beep(1000, 150)  # Higher pitch
-            winsound.Beep(600, 150)   # Lower pitch
+        # rendered once on first use, played asynchronously from file
+        if not tones:
+            tones.update(tone_files(os.path.join(sts.resources_dir, 'tones')))
+        if status in tones:
+            winsound.PlaySound(tones[status], winsound.SND_FILENAME | winsound.SND_ASYNC)
     else:
         # Fallback if winsound is not available
         root.bell()
@@ -1,6 +1,6 @@
 # voice_class.py
 
-import json, os, pyaudio, pyttsx3, re, sys, threading, time, wave
+import json, os, pyaudio, pyttsx3, queue, re, sys, threading, time, wave
 from datetime import datetime as dt
 import tkinter as tk
 from tkinter import Label
@@ -12,32 +12,43 @@ import random as rd
 from vosk import Model, KaldiRecognizer, SetLogLevel
 
 import voice.settings as sts
+from voice.helpers.vad import EnergyGate
+from voice.helpers.tones import tone_files
+from voice.helpers.realtime import boost_thread_priority
 # ---------------------------------------
 # Configuration
 # ---------------------------------------
 BASE = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(sts.resources_dir, 'vosk_model', 'vosk-model-en-us-0.42-gigaspeech')
 TIMEOUT_SECONDS = 20
-LISTEN_TIMEOUT = .1
 PROGRESS_BAR_SECONDS = 28
-CHUNK = 1024
+# interval in ms at which the gui thread runs calls queued by worker threads
+GUI_POLL_MS = 50
+# 20 ms chunks, vosk can end an utterance at any chunk boundary
+CHUNK = 320
 RATE = 16000
+# about one second of audio in chunks, for the capture queue and the vad hangover
+CHUNKS_PER_SECOND = RATE // CHUNK
 CHANNELS = 1
 FORMAT = pyaudio.paInt16
 RUNTIME = re.sub(r"([: .])", r"-" , str(dt.now()))
-MESSAGES_FILE = os.path.join(sts.resources_dir, 'chats', f"{RUNTIME}_messages.json")
-PAUSE_COMMANDS = {
+MESSAGES_FILE = os.path.join(sts.resources_dir, 'chats', f"{RUNTIME}_messages.jsonl")
+PAUSE_COMMANDS = frozenset({
                 "stop recording", "stop listening", "end recording", "end listening",
                 "okay thanks", "okay bye", "thank you bye", "thanks bye", "alright thanks",
                 "alright bye", "forget it bye", "that's all bye", "okay that's it", 
                 "okay that's all", "hold it",
-}
+})
 
-EXIT_COMMANDS = {
+EXIT_COMMANDS = frozenset({
                     "over and out", "thank you and good bye", "good bye", "exit", "quit",
                     "thank you and goodbye", "goodbye",
-                }
-INVALID_TERMS = {"the", "I"}
+                })
+INVALID_TERMS = frozenset({"the", "I"})
+# one scan for all pause commands contained in a text
+PAUSE_RE = re.compile("|".join(map(re.escape, PAUSE_COMMANDS)))
+# a text without newlines is part of some exit command iff it is part of this string
+EXIT_COMMANDS_TEXT = "\n".join(EXIT_COMMANDS)
 
 try:
     import winsound
@@ -63,15 +74,21 @@ class Speaker:
         self.tts_engine = pyttsx3.init()
         self.tts_lock = threading.Lock()
         self.last_speak_time = 0  # Track when speaking finishes
+        # inverse of GLOBAL_SPEAKING_FLAG, so the listener can wait for speech to end
+        self.not_speaking = threading.Event()
+        self.not_speaking.set()
+        # status signals rendered once, played asynchronously from file
+        self.tones = tone_files(os.path.join(sts.resources_dir, 'tones')) if SOUND_AVAILABLE else {}
 
     def speak(self, *args, text: str, **kwargs) -> None:
         with self.tts_lock:
+            self.not_speaking.clear()
             GLOBAL_SPEAKING_FLAG.set()
-            time.sleep(LISTEN_TIMEOUT)
             self.tts_engine.say(text)
             self.tts_engine.runAndWait()
             self.last_speak_time = time.time()
             GLOBAL_SPEAKING_FLAG.clear()
+            self.not_speaking.set()
 
     def play_sound(self, *args, status: str, **kwargs) -> None:
         """
@@ -82,14 +99,9 @@ class Speaker:
         """
         with self.tts_lock:
             if SOUND_AVAILABLE:
-                if status == "LOADED":
-                    winsound.Beep(800, 150)
-                elif status == "START":
-                    winsound.Beep(600, 150)
-                    winsound.Beep(1000, 150)
-                elif status == "STOP":
-                    winsound.Beep(1000, 150)
-                    winsound.Beep(600, 150)
+                if status in self.tones:
+                    winsound.PlaySound(self.tones[status],
+                                       winsound.SND_FILENAME | winsound.SND_ASYNC)
             else:
                 root = tk.Tk()
                 root.bell()
@@ -122,9 +134,23 @@ class Listener:
         self.last_speech_time = time.time()
         self.recognizer = None
         self.audio = pyaudio.PyAudio()
+        self.sampwidth = self.audio.get_sample_size(FORMAT)
+        # the input stream is opened once and only started/stopped per recording
+        self.audio_q = queue.Queue(maxsize=CHUNKS_PER_SECOND)
+        self.stream = self.audio.open(
+            format=FORMAT,
+            channels=CHANNELS,
+            rate=RATE,
+            input=True,
+            frames_per_buffer=CHUNK,
+            stream_callback=self.on_audio,
+            start=False,
+        )
         self.recording_thread = None
         self.gui_root = None
         self.recording_label = None
+        # tk is not thread safe, worker threads queue gui calls for the gui thread
+        self.gui_calls = queue.SimpleQueue()
         self.reacts = ('How can I help?', 'What now?', 'What do you want!', 'Not again!',
                        'Havent I suffered enough?')
         self.shutdown_callback = shutdown_callback
@@ -135,6 +161,30 @@ class Listener:
         """
         self.model = Model(self.model_path)
         self.recognizer = KaldiRecognizer(self.model, RATE)
+        # warm up the decoder, the first AcceptWaveform is much slower than later ones
+        self.recognizer.AcceptWaveform(bytes(CHUNK * self.sampwidth))
+        self.recognizer.FinalResult()
+
+    def on_audio(self, in_data, frame_count, time_info, status) -> tuple:
+        """
+        PortAudio stream callback, queues captured chunks for record_audio.
+        Runs on the portaudio thread, own speech and overflow are dropped.
+        """
+        if not GLOBAL_SPEAKING_FLAG.is_set():
+            try:
+                self.audio_q.put_nowait(in_data)
+            except queue.Full:
+                pass
+        return None, pyaudio.paContinue
+
+    def close_stream(self, *args, **kwargs) -> None:
+        """
+        Close the input stream and release PyAudio, on shutdown only.
+        """
+        if self.stream.is_active():
+            self.stream.stop_stream()
+        self.stream.close()
+        self.audio.terminate()
 
     def setup_gui(self, *args, **kwargs) -> None:
         """
@@ -147,6 +197,29 @@ class Listener:
         self.recording_label = Label(self.gui_root, text="● Recording",
                                      font=("Helvetica", 24), fg="red")
         self.recording_label.pack(expand=True)
+        self.gui_root.after(GUI_POLL_MS, self._run_gui_calls)
+
+    def call_in_gui(self, func, *args, **kwargs) -> None:
+        """
+        Run func on the gui thread, directly if called from it, otherwise it is
+        queued and run by the gui mainloop.
+        """
+        if threading.current_thread() is threading.main_thread():
+            func(*args, **kwargs)
+        else:
+            self.gui_calls.put((func, args, kwargs))
+
+    def _run_gui_calls(self, *args, **kwargs) -> None:
+        """
+        Runs the queued gui calls, rescheduled on the mainloop every GUI_POLL_MS.
+        """
+        while True:
+            try:
+                func, f_args, f_kwargs = self.gui_calls.get_nowait()
+            except queue.Empty:
+                break
+            func(*f_args, **f_kwargs)
+        self.gui_root.after(GUI_POLL_MS, self._run_gui_calls)
 
     def toggle_recording(self, *args, **kwargs) -> None:
         """
@@ -163,7 +236,7 @@ class Listener:
         """
         self.recording = True
         print(f"{Fore.GREEN}Recording resumed!{Style.RESET_ALL}")
-        self.gui_root.deiconify()  # show recording symbol
+        self.call_in_gui(self.gui_root.deiconify)  # show recording symbol
         self.recording_thread = threading.Thread(target=self.record_audio)
         self.recording_thread.start()
 
@@ -178,43 +251,62 @@ class Listener:
     def record_audio(self, *args, **kwargs) -> None:
             if not self.running or not self.recording:
                 return
-            stream = self.audio.open(
-                format=FORMAT,
-                channels=CHANNELS,
-                rate=RATE,
-                input=True,
-                frames_per_buffer=CHUNK,
-            )
+            # this thread decodes the audio, it should not wait behind gui or polling
+            boost_thread_priority()
+            audio_q, stream = self.audio_q, self.stream
+            # chunks left over from the previous recording are stale
+            while not audio_q.empty():
+                audio_q.get_nowait()
+            stream.start_stream()
             self.last_speech_time = time.time()
-            frames = []
+            wf = self.open_wav(*args, **kwargs)
             self.say_hello(*args, **kwargs)
+            # silence is not decoded, only the tail vosk needs to end an utterance
+            gate = EnergyGate(hangover=CHUNKS_PER_SECOND)
+            # per chunk calls bound once, the recognizer is fixed while recording
+            get_chunk, gate_chunks, write_chunk = audio_q.get, gate.chunks, wf.writeframesraw
+            accept, result, loads = (self.recognizer.AcceptWaveform,
+                                     self.recognizer.Result, json.loads)
 
             while self.running and self.recording:
                 self.hold_while_speaking(*args, **kwargs)
-                data = stream.read(CHUNK, exception_on_overflow=False)
-                if self.recognizer.AcceptWaveform(data):
-                    self.text = eval(self.recognizer.Result())["text"].strip()
-                else:
+                try:
+                    data = get_chunk(timeout=1)
+                except queue.Empty:
+                    # no audio, still check for the silence timeout
                     self.text = ""
-                frames.append(data)
+                    self.is_valid_text(*args, **kwargs)
+                    continue
+                self.text = ""
+                for chunk in gate_chunks(data):
+                    if accept(chunk):
+                        self.text = loads(result()).get("text", "").strip()
+                # the silence timeout follows speech above the noise floor, not vosk's commits
+                if gate.voiced:
+                    self.last_speech_time = time.time()
+                # raw write, the wav header is patched only once on close
+                write_chunk(data)
                 if self.is_valid_text(*args, **kwargs):
                     self.conversation.append_message(role="user", content=self.text)
                     self.last_speech_time = time.time()
 
             # --- SAFE CLEANUP SEQUENCE ---
             stream.stop_stream()
-            stream.close()
+            wf.close()
 
-            # Now that the stream is safely closed, get the final result.
-            final_text = eval(self.recognizer.FinalResult()).get("text", "").strip()
+            # Now that the stream is safely stopped, get the final result.
+            final_text = json.loads(self.recognizer.FinalResult()).get("text", "").strip()
             if final_text and final_text not in INVALID_TERMS:
                  self.conversation.append_message(role="user", content=final_text)
 
             print(f"{Fore.RED}Recording paused!{Style.RESET_ALL}")
-            self.gui_root.withdraw()
+            self.call_in_gui(self.gui_root.withdraw)
             self.speaker.play_sound(status="STOP")
-            self.save_audio(frames)
-            self.recognizer = KaldiRecognizer(self.model, RATE)
+            # reuse the recognizer, a new one reallocates the decoder graph state
+            if hasattr(self.recognizer, "Reset"):
+                self.recognizer.Reset()
+            else:
+                self.recognizer = KaldiRecognizer(self.model, RATE)
 
     def say_hello(self, *args, **kwargs) -> None:
         """
@@ -225,19 +317,9 @@ class Listener:
 
     def hold_while_speaking(self, *args, **kwargs) -> None:
         """
-        Hold the recording for a specified time.
+        Hold the recording until the speaker has finished speaking.
         """
-        while GLOBAL_SPEAKING_FLAG.is_set():
-            time.sleep(0.05)
-            continue
-
-    def recognize_text(self, *args, **kwargs) -> str:
-        data = self.stream.read(CHUNK)
-        if self.recognizer.AcceptWaveform(data):
-            self.text = eval(self.recognizer.Result())["text"].strip()
-        else:
-            self.text = ""
-        self.frames.append(data)
+        self.speaker.not_speaking.wait()
 
     def is_valid_text(self, *args, **kwargs) -> None:
         """
@@ -250,17 +332,19 @@ class Listener:
             str: Cleaned up text.
         """
         if self.text and self.text not in INVALID_TERMS:
-            if any(cmd in self.text for cmd in PAUSE_COMMANDS):
+            # exact commands are a hash lookup, the scans only run for longer texts
+            if self.text in PAUSE_COMMANDS or PAUSE_RE.search(self.text):
                 print(f"{Fore.YELLOW}Pausing recording.{Style.RESET_ALL}")
                 self.recording = False
                 return False
-            if any(self.text in cmd for cmd in EXIT_COMMANDS):
+            if self.text in EXIT_COMMANDS or self.text in EXIT_COMMANDS_TEXT:
                 print(f"{Fore.YELLOW}Exit command recognized. Shutting down.{Style.RESET_ALL}")
                 self.running = False
                 if self.shutdown_callback:
                     self.shutdown_callback()
-                else:
-                    sys.exit(0)
+                elif self.gui_root is not None:
+                    # sys.exit would only end this worker thread
+                    self.call_in_gui(self.gui_root.quit)
                 return False
             return True
         if time.time() - self.last_speech_time > self.timeout:
@@ -270,38 +354,47 @@ class Listener:
 
     def cleanup(self, *args, **kwargs) -> None:
         final_res = self.recognizer.FinalResult()
-        final_text = eval(final_res).get("text", "").strip()
+        final_text = json.loads(final_res).get("text", "").strip()
         if final_text and final_text not in INVALID_TERMS:
-            if any(final_text in cmd for cmd in EXIT_COMMANDS):
+            if final_text in EXIT_COMMANDS or final_text in EXIT_COMMANDS_TEXT:
                 self.conversation.append_message(role="user", content='/bye')
-            elif any(cmd in final_text for cmd in PAUSE_COMMANDS):
+            elif final_text in PAUSE_COMMANDS or PAUSE_RE.search(final_text):
                 pass
             else:
                 self.conversation.append_message(role="user", content=final_text)
 
-    def save_audio(self, frames, *args, **kwargs) -> None:
+    def open_wav(self, *args, **kwargs) -> wave.Wave_write:
         """
-        Save recorded audio to output.wav.
+        Open output.wav, recorded chunks are streamed into it while recording.
         
-        Args:
-            frames (list): Recorded audio frames.
+        Returns:
+            wave.Wave_write: Writer with channels, sample width and rate set.
         """
-        with wave.open("output.wav", "wb") as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(self.audio.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
+        wf = wave.open("output.wav", "wb")
+        wf.setnchannels(CHANNELS)
+        wf.setsampwidth(self.sampwidth)
+        wf.setframerate(RATE)
+        return wf
 
 
 class Conversation:
     """
     Manages the conversation in memory and persists messages to a file
-    asynchronously.
+    asynchronously, one json object per line appended by a single writer thread.
     """
     def __init__(self) -> None:
         self.messages: dict[str, list[dict]] = {"assistant": [], "user": []}
         self.msg_count_assistant = 0
         self.msg_count_user = 0
+        # set whenever a user message arrives, so monitors can wait instead of poll
+        self.new_user_msg = threading.Event()
+        # notified whenever an assistant message arrives
+        self.new_assistant_msg = threading.Condition()
+        # callbacks called with each new user message, on the appending thread
+        self.on_user_message: list = []
+        self._write_q = queue.Queue()
+        self._writer = threading.Thread(target=self._write_messages, daemon=True)
+        self._writer.start()
 
     def append_message(self, role: str, content: str) -> None:
         """
@@ -314,24 +407,40 @@ class Conversation:
         msg = {"role": role, "content": content, "msg_timestamp": time.time()}
         self.messages[role].append(msg)
         if role == "assistant":
-            self.msg_count_assistant += 1
+            with self.new_assistant_msg:
+                self.msg_count_assistant += 1
+                self.new_assistant_msg.notify_all()
         elif role == "user":
             self.msg_count_user += 1
+            self.new_user_msg.set()
+            for callback in self.on_user_message:
+                callback(msg)
         color = Fore.YELLOW if role == "assistant" else Fore.GREEN
         print(f"{color}{role}:{Style.RESET_ALL} {content}")
-        threading.Thread(target=self._save_message_to_file, args=(msg,)).start()
+        self._write_q.put(msg)
 
-    def _save_message_to_file(self, msg: dict) -> None:
-        messages = []
-        if os.path.exists(MESSAGES_FILE):
-            try:
-                with open(MESSAGES_FILE, "r", encoding="utf-8") as f:
-                    messages = json.load(f)
-            except json.JSONDecodeError:
-                messages = []
-        messages.append(msg)
-        with open(MESSAGES_FILE, "w", encoding="utf-8") as f:
-            json.dump(messages, f, ensure_ascii=False, indent=2)
+    def _write_messages(self) -> None:
+        """
+        Writer thread, appends queued messages to MESSAGES_FILE until None is queued.
+        """
+        f = None
+        try:
+            for msg in iter(self._write_q.get, None):
+                if f is None:
+                    os.makedirs(os.path.dirname(MESSAGES_FILE), exist_ok=True)
+                    f = open(MESSAGES_FILE, "a", encoding="utf-8")
+                f.write(json.dumps(msg, ensure_ascii=False) + "\n")
+                f.flush()
+        finally:
+            if f is not None:
+                f.close()
+
+    def close(self) -> None:
+        """
+        Flush pending messages to file and stop the writer thread.
+        """
+        self._write_q.put(None)
+        self._writer.join()
     
     def get_last_n_messages(self, role: str = None, n: int = 1) -> list:
         """
@@ -364,15 +473,29 @@ class ConversationManager:
         self.running = True
 
     def poll_responses(self, *args, **kwargs) -> None:
+        """
+        Speak new assistant messages, blocks on the conversation until one arrives.
+        """
+        new_msg = self.conversation.new_assistant_msg
         last_msg_count = self.conversation.msg_count_assistant
         while self.running:
-            current_count = self.conversation.msg_count_assistant
+            with new_msg:
+                new_msg.wait_for(lambda: not self.running
+                                 or self.conversation.msg_count_assistant > last_msg_count)
+                current_count = self.conversation.msg_count_assistant
             if current_count > last_msg_count:
                 response = self.conversation.get_last_n_messages(role='assistant', n=1)
                 if response:
                     self.speaker.speak(text=response)
                 last_msg_count = current_count
-            time.sleep(0.5)
+
+    def stop(self, *args, **kwargs) -> None:
+        """
+        Stop poll_responses, wakes it if it is waiting for a message.
+        """
+        with self.conversation.new_assistant_msg:
+            self.running = False
+            self.conversation.new_assistant_msg.notify_all()
 
     @property
     def msg_count_assistant(self) -> int:
@@ -382,6 +505,14 @@ class ConversationManager:
     def msg_count_user(self) -> int:
         return self.conversation.msg_count_user
 
+    @property
+    def new_user_msg(self) -> threading.Event:
+        return self.conversation.new_user_msg
+
+    @property
+    def on_user_message(self) -> list:
+        return self.conversation.on_user_message
+
 
 class App:
     def __init__(self, *args, **kwargs):
@@ -466,12 +597,22 @@ class App:
 
     def shutdown(self, *args, **kwargs) -> None:
         """
-        Shutdown procedure.
+        Shutdown procedure. Worker threads, such as the recording thread on an exit
+        command, only stop listening and hand the shutdown to the gui thread, where
+        the stream is closed and the mainloop ends.
         """
+        self.listener.running = False
+        if threading.current_thread() is not threading.main_thread():
+            self.listener.call_in_gui(self.shutdown)
+            return
         print("Exiting...")
         self.speaker.speak(text='Have a nice day, bye.')
-        self.listener.running = False
-        self.conv_manager.running = False
+        recording_thread = self.listener.recording_thread
+        if recording_thread is not None:
+            recording_thread.join()
+        self.listener.close_stream()
+        self.conv_manager.stop()
+        self.conversation.close()
         if self.keyboard_listener is not None:
             self.keyboard_listener.stop()
         if self.listener.gui_root:
@@ -1,16 +1,20 @@
 # Replace the entire contents of this file with the new class-based structure
 
 import requests
-import time
 import threading
 from pynput import keyboard
 import voice.settings as sts
 
+# seconds the server may hold a /result request open
+RESULT_WAIT = 30
+
 class VoskClient:
     def __init__(self, *args, va_server: int, key: str = "f20", **kwargs):
         self.server_url = f"{va_server}:{sts.va_port}"
         self.trigger_key_str = key.lower()
         self.is_listening = False
+        # one keep-alive connection for all requests to the server
+        self.session = requests.Session()
         try:
             self.trigger_key = getattr(keyboard.Key, self.trigger_key_str)
         except AttributeError:
@@ -20,17 +24,18 @@ class VoskClient:
         print("Waiting for result...")
         while True:
             try:
-                resp = requests.get(f"{self.server_url}/result", timeout=5)
+                # long poll, the server answers as soon as the session has ended
+                resp = self.session.get(f"{self.server_url}/result",
+                                    params={"wait": RESULT_WAIT}, timeout=RESULT_WAIT + 5)
                 resp.raise_for_status()
                 result = resp.json().get("result")
-                if result:
+                if result is not None:
                     transcript = " ".join([msg.get("content", "") for msg in result])
                     print(f"Transcript: {transcript}")
                     break
             except requests.exceptions.RequestException as e:
                 print(f"Error fetching result: {e}")
                 break
-            time.sleep(1)
         self.is_listening = False
         print("Ready for next session. Press F20 to start again.")
 
@@ -39,7 +44,7 @@ class VoskClient:
         action = "Stopping" if self.is_listening else "Starting"
         print(f"{action} remote listening on {self.server_url}/{endpoint}...")
         try:
-            requests.post(f"{self.server_url}/{endpoint}", timeout=5)
+            self.session.post(f"{self.server_url}/{endpoint}", timeout=5)
             self.is_listening = not self.is_listening
             if not self.is_listening: # If we just stopped, get the result
                 self._get_result()
@@ -1,110 +1,185 @@
 # voice/vosk_server.py
 
-import time, threading
-from flask import Flask, jsonify
+import atexit, json, logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, jsonify, request
 from voice.voice_class import App
 
+try:
+    import waitress
+    _has_waitress = True
+except ImportError:
+    waitress = None
+    _has_waitress = False
+
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+    _has_orjson = True
+except ImportError:
+    orjson = None
+    _has_orjson = False
+
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 
+if _has_orjson:
+    class ORJSONProvider(JSONProvider):
+        """
+        Flask json provider backed by orjson, used by jsonify for /result.
+        """
+        def dumps(self, obj, **kwargs) -> str:
+            return orjson.dumps(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+# control requests run on a small fixed pool, not on a new thread per request
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vosk-ctl")
+atexit.register(_EXECUTOR.shutdown, wait=False)
+# longest time a /result request blocks for a listen session to finish
+LONG_POLL_SECONDS = 30
+
 class Chat:
     def __init__(self):
         self.app = App()
         self.prev_user_count = self.app.conv_manager.msg_count_user
-        print(f"Initial user message count: {self.prev_user_count}")
+        logger.debug("Initial user message count: %s", self.prev_user_count)
         self.last_transcript = None
-        self.lock = threading.Lock()
+        # set once by /bye or /stop, read from the api and recording threads
+        self._stop_event = threading.Event()
+        self.app.conv_manager.on_user_message.append(self._handle_user_message)
 
-    def monitor_conversation(self):
-        try:
-            while True:
-                if self.app.conv_manager.msg_count_user != self.prev_user_count:
-                    print(f"{self.get_session_user_messages() = }")
-                    last_user_msg = self.app.conversation.get_last_n_messages(role="user")
-                    print(f"Last user message: {last_user_msg}")
-                    time.sleep(2)
-                    if '/bye' in last_user_msg:
-                        self.running = False
-                        raise KeyboardInterrupt
-                    self.prev_user_count = self.app.conv_manager.msg_count_user
-                time.sleep(0.2)
-        except KeyboardInterrupt:
-            print("Shutting down conversation monitoring...")
+    @property
+    def running(self) -> bool:
+        return not self._stop_event.is_set()
+
+    def stop(self) -> None:
+        """
+        Signals shutdown and ends a running listen session.
+        """
+        self._stop_event.set()
+        self.app.listener.running = False
+
+    def _handle_user_message(self, msg: dict) -> None:
+        """
+        Called by the conversation for every new user message. Only a message
+        that is exactly /bye, apart from surrounding whitespace, ends the chat.
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Session user messages: %s", self.get_session_user_messages())
+            logger.debug("Last user message: %s", msg)
+        if msg["content"].strip() == '/bye':
+            self.stop()
+            logger.info("Shutting down conversation monitoring...")
 
     def run(self):
-        monitor_thread = threading.Thread(target=self.monitor_conversation, daemon=True)
-        monitor_thread.start()
         self.app.run()
 
 class VoskServer(Chat):
     def __init__(self):
         super().__init__()
-        self.listen_start_user_count = None
+        # index of the first user message of the current listen session, starts
+        # at the end of the loaded history so no session returns older messages
+        self.listen_start_idx = len(self.app.conversation.messages["user"])
         self.listening_lock = threading.Lock()
         self.is_listening = False
         threading.Thread(target=self.start_api, daemon=True).start()
 
     def start_api(self):
         app.config["VOSK_SERVER"] = self
-        app.run(host="0.0.0.0", port=5005)
+        if _has_waitress:
+            # production wsgi server, a fixed thread pool instead of the dev server
+            waitress.serve(app, host="0.0.0.0", port=5005, threads=4)
+        else:
+            app.run(host="0.0.0.0", port=5005, threaded=True)
 
     def trigger_listen(self):
-        with self.listening_lock:
-            if not self.is_listening and not self.app.listener.recording:
-                self.listen_start_user_count = self.app.conv_manager.msg_count_user
-                self.is_listening = True
-                print("[SERVER] Starting listen session at user_count", self.listen_start_user_count)
-                self.app.listener.toggle_recording()  # Starts listening
-                self.is_listening = False
-                print("[SERVER] Finished listen session")
+        # non blocking acquire as compare-and-swap, a concurrent /listen returns at once
+        if not self.listening_lock.acquire(blocking=False):
+            return
+        try:
+            listener = self.app.listener
+            if listener.recording:
+                return
+            self.listen_start_idx = len(self.app.conversation.messages["user"])
+            self.is_listening = True
+            logger.debug("Starting listen session at user_count %s", self.listen_start_idx)
+            listener.toggle_recording()  # Starts listening
+            logger.debug("Finished listen session")
+        finally:
+            self.is_listening = False
+            self.listening_lock.release()
 
     def hold_listen(self):
-        # Only toggle_recording to pause/stop; DO NOT reset listen_start_user_count
+        # Only toggle_recording to pause/stop; DO NOT reset listen_start_idx
         if self.app.listener.recording:
-            print("[SERVER] Pausing listen session")
+            logger.debug("Pausing listen session")
             self.app.listener.toggle_recording()
-            print("[SERVER] Paused listen session")
+            logger.debug("Paused listen session")
 
     def get_session_user_messages(self):
-        start = self.listen_start_user_count or 0
-        print(f"Getting session user messages from count: {start}")
-        curr = self.app.conv_manager.msg_count_user
-        print(f"Current user message count: {curr}")
-        n = curr - start
-        print(f"Number of new user messages since listening started: {n}")
-        if n > 0:
-            # Return last n user messages
-            return self.app.conversation.get_last_n_messages(role="user", n=n)
-        return []
+        start = self.listen_start_idx
+        # user messages are only appended, the session is the tail from start
+        msgs = self.app.conversation.messages["user"][start:]
+        logger.debug("%s new user messages since listening started at %s", len(msgs), start)
+        return msgs
 
 # Flask endpoints
+# constant bodies are serialized once, each request only wraps them in a Response
+_STATIC_BODIES = {
+    status: json.dumps({"status": status}).encode()
+    for status in ("running", "listening", "paused", "stopped")
+}
+_NO_RESULT_BODY = json.dumps({"result": None}).encode()
+_EMPTY_RESULT_BODY = json.dumps({"result": []}).encode()
+
+def _static_response(body: bytes) -> Response:
+    return Response(body, mimetype="application/json")
+
 @app.route('/status', methods=['GET'])
 def status():
-    return jsonify({"status": "running"})
+    return _static_response(_STATIC_BODIES["running"])
 
 @app.route('/listen', methods=['POST'])
 def listen():
     server = app.config["VOSK_SERVER"]
-    threading.Thread(target=server.trigger_listen).start()
-    return jsonify({"status": "listening"})
+    _EXECUTOR.submit(server.trigger_listen)
+    return _static_response(_STATIC_BODIES["listening"])
 
 @app.route('/result', methods=['GET'])
 def result():
+    """
+    Session user messages once listening has finished, {"result": None} while it
+    is still running. With ?wait=<seconds> the request blocks until the session
+    ends (at most LONG_POLL_SECONDS) instead of the client polling.
+    """
     server = app.config["VOSK_SERVER"]
-    if not server.app.listener.recording:
+    wait = min(request.args.get("wait", 0, type=float), LONG_POLL_SECONDS)
+    listener = server.app.listener
+    recording_thread = listener.recording_thread
+    if wait > 0 and recording_thread is not None:
+        # the recording thread ends after the final result is appended
+        recording_thread.join(wait)
+    if not listener.recording:
         msgs = server.get_session_user_messages()
-        print(f"Returning session user messages: {msgs}")
+        if not msgs:
+            return _static_response(_EMPTY_RESULT_BODY)
+        logger.debug("Returning session user messages: %s", msgs)
         return jsonify({"result": msgs})
     else:
-        return jsonify({"result": None})
+        return _static_response(_NO_RESULT_BODY)
 
 @app.route('/hold', methods=['POST'])
 def hold():
     server = app.config["VOSK_SERVER"]
-    threading.Thread(target=server.hold_listen).start()
-    return jsonify({"status": "paused"})
+    _EXECUTOR.submit(server.hold_listen)
+    return _static_response(_STATIC_BODIES["paused"])
 
 @app.route('/stop', methods=['POST'])
 def stop():
     server = app.config["VOSK_SERVER"]
-    server.running = False
-    return jsonify({"status": "stopped"})
+    server.stop()
+    return _static_response(_STATIC_BODIES["stopped"])